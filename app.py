@@ -1,7 +1,12 @@
+import cProfile
+
 import streamlit as st
 import plotly.io as pio
 import plotly.graph_objects as go
 
+import config
+import diagnostics
+import metrics
 from config import GO_BASE_LAYOUT
 
 app = st.navigation({
@@ -20,4 +25,19 @@ app = st.navigation({
 })
 
 if __name__ == "__main__":
-    app.run()
+    if config.METRICS_PORT:
+        metrics.serve(config.METRICS_ADDRESS, config.METRICS_PORT)
+
+    profiler = cProfile.Profile() if diagnostics.profile_requested() else None
+    rerun = None
+    if profiler is not None or diagnostics.requested():
+        rerun = diagnostics.start(app.title, profiled=profiler is not None)
+    try:
+        if profiler is not None:
+            profiler.enable()
+        app.run()
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        if rerun is not None:
+            diagnostics.show(diagnostics.finish(rerun), profiler)
@@ -0,0 +1,165 @@
+"""Benchmark every generate_task_N (and generate_task_4_heatmap) over a fixed set of inputs.
+
+Each case is timed without any caching, then run once more to measure its peak
+memory; the size of the JSON of every figure it returns is the payload sent to
+the browser. Results can be saved and compared against a previous run:
+
+    python bench.py --output bench.json
+    python bench.py --baseline bench.json --threshold 0.5
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from importlib import import_module
+
+import numpy as np
+import plotly
+import plotly.io as pio
+from plotly.basedatatypes import BaseFigure
+
+# (task, case name, inputs differing from the task's PLOT_DEFAULTS); a task such as "4_heatmap" is
+# generate_task_4_heatmap, with the HEATMAP_DEFAULTS of tasks/task_4.py
+CASES = [
+    (1, "default", {}),
+    (1, "tiny dt", {"dt": 1e-4}),
+    (1, "theta near 90", {"theta": 89.9}),
+    (2, "default", {}),
+    (2, "theta near 90", {"theta": 89.9}),
+    (3, "default", {}),
+    (3, "far target", {"target_x": 1000.0, "target_y": 500.0, "u": 200.0}),
+    (4, "default", {}),
+    (4, "theta near 90", {"theta": 89.9}),
+    ("4_heatmap", "default", {}),
+    ("4_heatmap", "flight time", {"quantity": "flight_time"}),
+    ("4_heatmap", "below ground", {"h": -10.0}),
+    (5, "default", {}),
+    (5, "far target", {"target_x": 1000.0, "target_y": 500.0, "u": 200.0}),
+    (6, "default", {}),
+    (6, "theta near 90", {"theta": 89.9}),
+    (7, "default", {}),
+    (7, "fast launch", {"u": 1000.0}),
+    (8, "default", {}),
+    (8, "many bounces", {"N": 10_000, "C": 0.99}),
+    (8, "verlet", {"method": "verlet"}),
+    (8, "verlet tiny dt", {"method": "verlet", "dt": 1e-4}),
+    (8, "theta near 90", {"theta": 89.9}),
+    (9, "default", {}),
+    (9, "tiny dt", {"dt": 1e-5}),
+    (9, "theta near 90", {"theta": 89.9}),
+    (9, "rk45", {"method": "rk45"}),
+    (9, "rk45 tight tol", {"method": "rk45", "tol": 1e-12}),
+]
+
+# measurements compared against the baseline, and the smallest change in each that counts as a regression
+METRICS = {"time": 1e-3, "peak_bytes": 64 * 1024, "payload_bytes": 1024}
+
+
+def case_id(task: int | str, name: str) -> str:
+    return f"task_{task}/{name.replace(' ', '_')}"
+
+
+def payload_bytes(result) -> int:
+    if isinstance(result, BaseFigure):
+        return len(pio.to_json(result, validate=False))
+    if isinstance(result, tuple):
+        return sum(payload_bytes(item) for item in result)
+    return 0
+
+
+def run_case(task: int | str, overrides: dict, repeat: int) -> dict:
+    number, _, variant = str(task).partition("_")
+    module = import_module(f"tasks.task_{number}")
+    generate = getattr(module, f"generate_task_{task}")
+    kwargs = getattr(module, f"{variant.upper()}_DEFAULTS" if variant else "PLOT_DEFAULTS") | overrides
+
+    # the first call in a process also pays for imports and for plotly building its validators
+    generate(**kwargs)
+
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = generate(**kwargs)
+        times.append(time.perf_counter() - start)
+
+    # tracing slows everything down, so memory is measured on a separate run
+    tracemalloc.start()
+    generate(**kwargs)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return dict(inputs=kwargs,
+                time=min(times),
+                median_time=statistics.median(times),
+                peak_bytes=peak,
+                payload_bytes=payload_bytes(result))
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """Describe every measurement more than `threshold` (a fraction) worse than in `baseline`."""
+    regressions = []
+    for key, result in results.items():
+        if key not in baseline:
+            continue
+
+        for metric, min_delta in METRICS.items():
+            old, new = baseline[key][metric], result[metric]
+            if new - old > max(old * threshold, min_delta):
+                regressions.append(f"{key}: {metric} {old:.4g} -> {new:.4g}")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per case (best is kept)")
+    parser.add_argument("--filter", default="", help="only run cases whose id contains this")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="JSON file from a previous run to compare against")
+    parser.add_argument("--threshold",
+                        type=float,
+                        default=0.25,
+                        help="allowed slowdown/growth relative to the baseline (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    results = {}
+    for task, name, overrides in CASES:
+        key = case_id(task, name)
+        if args.filter not in key:
+            continue
+
+        results[key] = result = run_case(task, overrides, args.repeat)
+        print(f"{key:<28} {result['time'] * 1000:9.2f} ms {result['peak_bytes'] / 1024**2:8.2f} MiB"
+              f" {result['payload_bytes'] / 1024:9.1f} kB")
+
+    if args.output:
+        report = dict(created=time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                      python=platform.python_version(),
+                      numpy=np.__version__,
+                      plotly=plotly.__version__,
+                      repeat=args.repeat,
+                      results=results)
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+        print(f"results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)["results"]
+
+        regressions = compare(results, baseline, args.threshold)
+        for regression in regressions:
+            print(f"regression: {regression}", file=sys.stderr)
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    sys.exit(main())
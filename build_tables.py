@@ -0,0 +1,40 @@
+"""Build the precomputed drag table used by the lookup table method of Task 9.
+
+Run once after installing, and during the Docker build; the table is written
+to `config.DRAG_TABLE_PATH` (set `BPHO_DRAG_TABLE_PATH` to move it):
+
+    python build_tables.py
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+import config
+import tables
+from physics import drag_table
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", default=config.DRAG_TABLE_PATH, help="where to write the table")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    table = drag_table.build()
+    tables.save(args.output, table, kind="drag", version=drag_table.VERSION)
+
+    errors = table[:-1, :-1, :-1, drag_table.ERR]
+    print(f"{table.shape[:3]} grid in {time.perf_counter() - start:.1f} s, "
+          f"{table.nbytes / 1024**2:.1f} MiB written to {args.output}")
+    print(f"relative error of the cells: median {np.median(errors):.1e}, "
+          f"99th percentile {np.quantile(errors, 0.99):.1e}, max {errors.max():.1e}")
+    return 0
+
+
+if __name__ == "__main__":
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    sys.exit(main())
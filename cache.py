@@ -1,19 +1,552 @@
-from streamlit import cache_data
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
 
+import plotly.graph_objects as go
+import plotly.io as pio
+from plotly.basedatatypes import BaseFigure
+from streamlit import cache_data, cache_resource
 
-# cache results only if kwargs supplied to function is equal to defaults
-def _cache_default_factory(cache_func):
+import config
+import diagnostics
+import metrics
+from physics import budget
 
-    def inner(**defaults):
+
+def _quantize(value, digits: int | None):
+    # round floats to a number of significant digits, so that e.g. 9.81 and 9.8100000001 share a key
+    if digits is not None and isinstance(value, float):
+        return float(f"{value:.{digits}g}")
+    return value
+
+
+def _pickled_size(value) -> int:
+    return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+class LRUCache:
+    """Thread-safe least recently used cache.
+
+    Entries are evicted oldest-first once there are more than `max_entries` of
+    them or their total size exceeds `max_bytes`, and expire `ttl` seconds
+    after being stored. Sizes are measured with `sizeof` (pickled size by
+    default) only when a byte budget is set.
+    """
+
+    def __init__(self,
+                 *,
+                 max_entries: int = 128,
+                 max_bytes: int | None = None,
+                 ttl: float | None = None,
+                 sizeof=_pickled_size):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.sizeof = sizeof
+
+        self._entries = OrderedDict()  # key -> (value, size, expires)
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bytes = 0
+
+    def get(self, key):
+        """Return (True, value) for a live entry, otherwise (False, None)."""
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is not None and entry[2] is not None and entry[2] < time.monotonic():
+                self._remove(key)
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                return False, None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, entry[0]
+
+    def put(self, key, value) -> None:
+        size = self.sizeof(value) if self.max_bytes is not None else 0
+        if self.max_bytes is not None and size > self.max_bytes:
+            return  # would evict everything else and still not fit
+
+        expires = time.monotonic() + self.ttl if self.ttl is not None else None
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+            self._entries[key] = (value, size, expires)
+            self.bytes += size
+
+            while len(self._entries) > self.max_entries or (self.max_bytes is not None
+                                                             and self.bytes > self.max_bytes):
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _remove(self, key) -> None:
+        _, size, _ = self._entries.pop(key)
+        self.bytes -= size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(hits=self.hits,
+                        misses=self.misses,
+                        evictions=self.evictions,
+                        entries=len(self._entries),
+                        bytes=self.bytes)
+
+
+# shared by every page, so the byte budget applies to the whole process
+page_cache = LRUCache(max_entries=config.CACHE_MAX_ENTRIES,
+                      max_bytes=config.CACHE_MAX_BYTES,
+                      ttl=config.CACHE_TTL)
+
+
+class _Flight:
+    __slots__ = ("done", "value", "error", "waiters")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Runs at most one call per key at a time.
+
+    Callers asking for a key that is already being computed wait for that call
+    and share its result or exception, instead of computing it again. A call
+    stopped because its own job was cancelled is not shared: its waiters start
+    a new one. While waiting, callers still honour their own deadline and
+    cancellation (see `physics.budget`).
+    """
+
+    def __init__(self, *, poll: float = 0.1):
+        self.poll = poll
+
+        self._flights = {}  # key -> _Flight
+        self._lock = threading.Lock()
+
+        self.calls = 0
+        self.shared = 0
+        self.contended = 0
+
+    def _acquire(self) -> None:
+        if not self._lock.acquire(blocking=False):
+            self._lock.acquire()
+            self.contended += 1
+
+    def do(self, key, func):
+        """Return `func()`, or the result of the call already in flight for `key`."""
+        while True:
+            self._acquire()
+            try:
+                flight = self._flights.get(key)
+                leader = flight is None
+                if leader:
+                    flight = self._flights[key] = _Flight()
+                    self.calls += 1
+                else:
+                    flight.waiters += 1
+                    self.shared += 1
+            finally:
+                self._lock.release()
+
+            if leader:
+                return self._lead(key, flight, func)
+
+            try:
+                while not flight.done.wait(self.poll):
+                    budget.check()
+            finally:
+                self._acquire()
+                flight.waiters -= 1
+                self._lock.release()
+
+            if isinstance(flight.error, budget.Cancelled):
+                continue
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+    def _lead(self, key, flight: _Flight, func):
+        try:
+            flight.value = func()
+            return flight.value
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            self._acquire()
+            try:
+                del self._flights[key]
+            finally:
+                self._lock.release()
+            flight.done.set()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(calls=self.calls,
+                        shared=self.shared,
+                        contended=self.contended,
+                        in_flight=len(self._flights),
+                        waiting=sum(flight.waiters for flight in self._flights.values()))
+
+
+# identical computations in progress anywhere in the process
+page_flights = SingleFlight()
+
+
+def cache_lru(cache: LRUCache = page_cache,
+              *,
+              quantize: int | None = config.CACHE_QUANTIZE_DIGITS,
+              flights: SingleFlight | None = page_flights):
+    """Memoize a keyword-only function on all of its arguments.
+
+    Float arguments are rounded to `quantize` significant digits, both in the
+    key and in the call, so nearly equal inputs share an entry and the cached
+    value is exactly the result for its key. Concurrent misses on the same key
+    are computed once through `flights`.
+    """
+
+    def wrapper(func):
+        name = (func.__module__, func.__qualname__)
+
+        @wraps(func)
+        def impl(**kwargs):
+            kwargs = {key: _quantize(value, quantize) for key, value in kwargs.items()}
+            key = (name, tuple(sorted(kwargs.items())))
+
+            found, value = cache.get(key)
+            diagnostics.record_lookup(func.__qualname__, "lru", found)
+            if found:
+                return value
+
+            def compute():
+                value = func(**kwargs)
+                cache.put(key, value)
+                return value
+
+            return flights.do(key, compute) if flights is not None else compute()
+
+        impl.cache = cache
+        return impl
+
+    return wrapper
+
+
+def cache_scaled(scaling, cache: LRUCache = page_cache, **options):
+    """Memoize a drag-free page function on its inputs normalized by `scaling` (a `tasks.scaling.Scaling`).
+
+    Inputs differing only in launch speed and gravity, at the same angle and
+    gh/u², share one entry computed for u = g = 1, which is rescaled on every
+    call. Inputs that cannot be normalized (u or g not positive) are cached
+    as they are. `options` are passed on to `cache_lru`.
+    """
+
+    def wrapper(func):
+        cached_func = cache_lru(cache, **options)(func)
+
+        @wraps(func)
+        def impl(**kwargs):
+            normalized, units = scaling.normalize(kwargs)
+            value = cached_func(**normalized)
+            return scaling.rescale(value, **units) if units is not None else value
+
+        impl.cache = cache
+        return impl
+
+    return wrapper
+
+
+_PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def _project_file(obj) -> str | None:
+    try:
+        path = os.path.abspath(inspect.getsourcefile(obj))
+    except TypeError:
+        return None
+    return path if path.startswith(_PROJECT_ROOT + os.sep) else None
+
+
+def _project_files(namespace: dict) -> set[str]:
+    # source files of the project modules, functions and classes in `namespace`, and of everything
+    # their own modules refer to in turn
+    files = set()
+    pending = [namespace]
+    while pending:
+        for value in pending.pop().values():
+            if not (inspect.ismodule(value) or inspect.isfunction(value) or inspect.isclass(value)):
+                continue
+            path = _project_file(value)
+            if path is None or path in files:
+                continue
+            files.add(path)
+            module = value if inspect.ismodule(value) else inspect.getmodule(value)
+            if module is not None:
+                pending.append(vars(module))
+    return files
+
+
+def source_fingerprint(func) -> str:
+    """Hash of the source files of `func` and of the project modules it depends on.
+
+    Editing the function, the page it is defined on, any project module it
+    uses directly or through other project modules (e.g. the physics package),
+    or this module, which stores the results, gives a different fingerprint.
+    """
+    func = inspect.unwrap(func)
+    files = _project_files(func.__globals__) | {_project_file(func), os.path.abspath(__file__)}
+    files.discard(None)
+
+    digest = hashlib.sha256(inspect.getsource(func).encode())
+    for path in sorted(files):
+        with open(path, "rb") as file:
+            digest.update(file.read())
+    return digest.hexdigest()
+
+
+class _FigureJSON(str):
+    """Serialized figure stored in place of a go.Figure inside a cached result."""
+
+
+def _freeze_figures(value):
+    # figures are stored as JSON: unpickling a go.Figure re-validates every property, which is far slower
+    if isinstance(value, BaseFigure):
+        return _FigureJSON(value.to_json())
+    if isinstance(value, tuple):
+        return tuple(_freeze_figures(item) for item in value)
+    return value
+
+
+def _thaw_figures(value):
+    if isinstance(value, _FigureJSON):
+        # the JSON was produced from a validated figure, so there is no need to validate it again
+        return go.Figure(json.loads(value), _validate=False)
+    if isinstance(value, tuple):
+        return tuple(_thaw_figures(item) for item in value)
+    return value
+
+
+class DiskCache:
+    """Results cache in a SQLite file, shared by every process on the host.
+
+    Values are pickled, with any Plotly figures in them stored as JSON, and
+    keyed by function name and canonical (JSON) parameters. Each entry also records the source fingerprint of the function
+    that produced it, and entries from any other version of the source are
+    deleted on first use. Once there are more than `max_entries` entries, or
+    their values take more than `max_bytes`, the oldest are deleted. Any
+    SQLite error is treated as a miss so that a locked or read-only database
+    never breaks a page.
+    """
+
+    def __init__(self, path: str, *, max_entries: int | None = None, max_bytes: int | None = None):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+        self._local = threading.local()
+        self._purged = set()
+
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS results (func TEXT, params TEXT, source TEXT,"
+                         " value BLOB, stored REAL, PRIMARY KEY (func, params))")
+            self._local.conn = conn
+        return conn
+
+    def _purge(self, conn: sqlite3.Connection, func: str, source: str) -> None:
+        if (func, source) not in self._purged:
+            conn.execute("DELETE FROM results WHERE func = ? AND source != ?", (func, source))
+            self._purged.add((func, source))
+
+    def get(self, func: str, source: str, params: str):
+        """Return (True, value) for a stored result, otherwise (False, None)."""
+        try:
+            conn = self._connect()
+            self._purge(conn, func, source)
+            row = conn.execute("SELECT value FROM results WHERE func = ? AND params = ?",
+                               (func, params)).fetchone()
+        except sqlite3.Error:
+            self.errors += 1
+            row = None
+
+        if row is None:
+            self.misses += 1
+            return False, None
+
+        self.hits += 1
+        return True, _thaw_figures(pickle.loads(row[0]))
+
+    def put(self, func: str, source: str, params: str, value) -> None:
+        blob = pickle.dumps(_freeze_figures(value), protocol=pickle.HIGHEST_PROTOCOL)
+        if self.max_bytes is not None and len(blob) > self.max_bytes:
+            return  # would evict everything else and still not fit
+
+        try:
+            conn = self._connect()
+            conn.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)",
+                         (func, params, source, blob, time.time()))
+            if self.max_entries is not None:
+                conn.execute(
+                    "DELETE FROM results WHERE rowid IN"
+                    " (SELECT rowid FROM results ORDER BY stored DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries, ))
+            if self.max_bytes is not None:
+                # keep the newest entries whose values fit in the budget together
+                conn.execute(
+                    "DELETE FROM results WHERE rowid IN (SELECT rowid FROM (SELECT rowid,"
+                    " SUM(length(value)) OVER (ORDER BY stored DESC, rowid DESC) AS total"
+                    " FROM results) WHERE total > ?)", (self.max_bytes, ))
+        except sqlite3.Error:
+            self.errors += 1
+
+    def stats(self) -> dict:
+        return dict(hits=self.hits, misses=self.misses, errors=self.errors)
+
+
+disk_cache = DiskCache(
+    config.CACHE_DISK_PATH, max_entries=config.CACHE_DISK_MAX_ENTRIES,
+    max_bytes=config.CACHE_DISK_MAX_BYTES) if config.CACHE_DISK_PATH else None
+
+
+def cache_disk(cache: DiskCache | None = disk_cache):
+    """Read results of a keyword-only function through a `DiskCache` (no-op without one)."""
+
+    def wrapper(func):
+        if cache is None:
+            return func
+
+        name = f"{func.__module__}.{func.__qualname__}"
+        source = None
+
+        @wraps(func)
+        def impl(**kwargs):
+            nonlocal source
+            if source is None:
+                source = source_fingerprint(func)
+
+            params = json.dumps(kwargs, sort_keys=True)
+            with diagnostics.phase("disk cache read"):
+                found, value = cache.get(name, source, params)
+            diagnostics.record_lookup(func.__qualname__, "disk", found)
+
+            if not found:
+                value = func(**kwargs)
+                with diagnostics.phase("disk cache write"):
+                    cache.put(name, source, params, value)
+            return value
+
+        return impl
+
+    return wrapper
+
+
+def _figure_payloads(value):
+    if isinstance(value, BaseFigure):
+        yield len(pio.to_json(value, validate=False))
+    elif isinstance(value, tuple):
+        for item in value:
+            yield from _figure_payloads(item)
+
+
+def _measure(func):
+    # time every computation, and measure its figures while metrics are being served
+    page = func.__module__.rpartition(".")[2]
+
+    @wraps(func)
+    def impl(**kwargs):
+        start = time.perf_counter()
+        value = func(**kwargs)
+        metrics.compute_seconds.observe(time.perf_counter() - start, page=page)
+
+        if metrics.serving():
+            for payload in _figure_payloads(value):
+                metrics.figure_payload_bytes.observe(payload, page=page)
+        return value
+
+    return impl
+
+
+def _limit_time(func):
+    # stop computations running longer than the timeout, so that one request cannot hold a worker
+    @wraps(func)
+    def impl(**kwargs):
+        with budget.deadline(config.COMPUTE_TIMEOUT):
+            return func(**kwargs)
+
+    return impl
+
+
+# hits and misses of the streamlit caches, which do not count them
+_layer_stats = {}  # layer -> [hits, misses]
+_layer_lock = threading.Lock()
+_layer_local = threading.local()
+
+
+# cache results if kwargs supplied to function is equal to defaults, otherwise fall back to an LRU cache
+# (keyed on normalized inputs when a drag-free page passes its `scaling`); both read through the disk
+# cache shared by all processes
+def _cache_default_factory(cache_func, fallback=None, *, layer: str):
+
+    def inner(scaling=None, **defaults):
 
         def wrapper(func):
-            cached_func = cache_func(func)
+            label = func.__qualname__
+            func = cache_disk()(_measure(_limit_time(diagnostics.timed("compute")(func))))
+            if scaling is not None:
+                fallback_func = cache_scaled(scaling)(func)
+            else:
+                fallback_func = fallback(func) if fallback is not None else func
+
+            @wraps(func)
+            def on_miss(**kwargs):
+                _layer_local.missed = True
+                return func(**kwargs)
 
+            cached_func = cache_func(on_miss)
+
+            @diagnostics.timed("generate")
             def impl(**kwargs):
+                diagnostics.record_call(label, kwargs)
                 if kwargs == defaults:
-                    return cached_func(**defaults)
+                    _layer_local.missed = False
+                    value = cached_func(**defaults)
+
+                    hit = not _layer_local.missed
+                    with _layer_lock:
+                        _layer_stats.setdefault(layer, [0, 0])[0 if hit else 1] += 1
+                    diagnostics.record_lookup(label, layer, hit)
+                    return value
                 else:
-                    return func(**kwargs)
+                    return fallback_func(**kwargs)
 
             return impl
 
@@ -22,5 +555,55 @@ def _cache_default_factory(cache_func):
     return inner
 
 
+def _collect_metrics():
+    lru = page_cache.stats()
+    flights = page_flights.stats()
+    disk = disk_cache.stats() if disk_cache is not None else None
+    with _layer_lock:
+        layers = {layer: tuple(counts) for layer, counts in _layer_stats.items()}
+
+    hits = [({"cache": "lru"}, lru["hits"])]
+    misses = [({"cache": "lru"}, lru["misses"])]
+    if disk is not None:
+        hits.append(({"cache": "disk"}, disk["hits"]))
+        misses.append(({"cache": "disk"}, disk["misses"]))
+    for layer, (layer_hits, layer_misses) in layers.items():
+        hits.append(({"cache": layer}, layer_hits))
+        misses.append(({"cache": layer}, layer_misses))
+
+    yield "bpho_cache_hits_total", "counter", "Lookups served from each results cache.", hits
+    yield "bpho_cache_misses_total", "counter", "Lookups missing from each results cache.", misses
+    yield ("bpho_cache_evictions_total", "counter", "Entries evicted from the in-process LRU cache.",
+           [({"cache": "lru"}, lru["evictions"])])
+    yield ("bpho_cache_entries", "gauge", "Entries in the in-process LRU cache.",
+           [({"cache": "lru"}, lru["entries"])])
+    yield ("bpho_cache_bytes", "gauge", "Pickled size of the entries in the in-process LRU cache.",
+           [({"cache": "lru"}, lru["bytes"])])
+    if disk is not None:
+        yield ("bpho_cache_errors_total", "counter", "SQLite errors in the disk cache.",
+               [({"cache": "disk"}, disk["errors"])])
+
+    yield ("bpho_single_flight_calls_total", "counter",
+           "Computations started, and computations shared with a caller asking for the same inputs.",
+           [({"role": "leader"}, flights["calls"]), ({"role": "waiter"}, flights["shared"])])
+    yield ("bpho_single_flight_lock_contended_total", "counter",
+           "Times the lock of the in-flight computations was found already held.",
+           [({}, flights["contended"])])
+    yield ("bpho_single_flight_in_flight", "gauge", "Computations in progress.",
+           [({}, flights["in_flight"])])
+    yield ("bpho_single_flight_waiting", "gauge",
+           "Callers waiting for a computation already in progress.", [({}, flights["waiting"])])
+
+
+metrics.register_collector(_collect_metrics)
+
 # can be used for things that can be stored in databases (includes go.Figure)
-cache_data_default = _cache_default_factory(cache_func=cache_data(show_spinner=False))
+cache_data_default = _cache_default_factory(cache_func=cache_data(show_spinner=False),
+                                            fallback=cache_lru(),
+                                            layer="cache_data")
+
+# shares one copy of the result between sessions instead of unpickling a new one on every hit, which
+# for go.Figure means re-validating the whole figure; results must be treated as read-only
+cache_resource_default = _cache_default_factory(cache_func=cache_resource(show_spinner=False),
+                                                fallback=cache_lru(),
+                                                layer="cache_resource")
@@ -1,7 +1,62 @@
-import streamlit as st
+import os
 
 GRAPH_SAMPLES = 50
 
+# longest path drawn from a fixed time step integration, however small the step
+MAX_PLOT_POINTS = 2000
+
+# (angle, speed) samples of a heatmap grid: about one per pixel of the plot area in the page, as
+# finer grids only add to the figure sent on every rerun and stored in the caches
+HEATMAP_SAMPLES = (600, 360)
+
+# animations play back in real time at this frame rate, with at most this many frames
+ANIMATION_FPS = 30
+ANIMATION_MAX_FRAMES = 300
+
+# limits on a single computation: inputs needing more steps or memory are computed with a cheaper method
+# (or refused), and anything still running after the timeout is stopped
+MAX_STEPS = 1_000_000
+MAX_COMPUTE_BYTES = 256 * 1024**2
+COMPUTE_TIMEOUT = 30  # sec
+
+# precomputed drag trajectories for the lookup table method of Task 9, built with build_tables.py and
+# memory-mapped by every process on the host (see tables.py)
+DRAG_TABLE_PATH = os.environ.get("BPHO_DRAG_TABLE_PATH", ".cache/drag_table.bin")
+# largest estimated relative error of a lookup before the launch is integrated instead; independent of
+# the RK45 tolerance, which applies per step and is far below the interpolation error of most cells
+MAX_TABLE_ERROR = 1e-2
+
+# heavy pages compute on a pool of this many threads shared by all sessions, so that the page can show
+# progress and a newer submission can cancel a computation still running for older inputs
+COMPUTE_WORKERS = int(os.environ.get("BPHO_COMPUTE_WORKERS") or 4)
+PROGRESS_INTERVAL = 0.1  # sec between progress bar updates
+
+# in-process cache of results for non-default inputs, shared by all pages
+CACHE_MAX_ENTRIES = 256
+CACHE_MAX_BYTES = 256 * 1024**2
+CACHE_TTL = 60 * 60  # sec
+CACHE_QUANTIZE_DIGITS = 10  # significant digits of float inputs used as cache keys
+
+# results cache on disk, shared by every process on the host and kept across restarts (empty to disable)
+CACHE_DISK_PATH = os.environ.get("BPHO_CACHE_DISK_PATH", ".cache/results.sqlite3")
+CACHE_DISK_MAX_ENTRIES = 10_000
+CACHE_DISK_MAX_BYTES = 1024**3  # total pickled size of the stored results
+
+# per-rerun timings and cache lookups shown in the sidebar, for every rerun or only for those whose URL
+# has ?diagnostics=1 (set the parameter to None to ignore the query string)
+DIAGNOSTICS = os.environ.get("BPHO_DIAGNOSTICS") == "1"
+DIAGNOSTICS_QUERY_PARAM = "diagnostics"
+
+# a profile of a single rerun can be downloaded from the diagnostics panel by adding ?profile=1 to the
+# URL, but only when profiling is allowed; never allow it for ordinary traffic
+PROFILING = os.environ.get("BPHO_PROFILING") == "1"
+PROFILE_QUERY_PARAM = "profile"
+
+# Prometheus metrics served at http://<address>:<port>/metrics (no port to disable); keep the address
+# local unless the port is only reachable by the scraper
+METRICS_PORT = int(os.environ.get("BPHO_METRICS_PORT") or 0) or None
+METRICS_ADDRESS = os.environ.get("BPHO_METRICS_ADDRESS", "127.0.0.1")
+
 PAGE_CONFIG = dict(layout="wide", page_icon="static/favicon/favicon.ico")
 
 PLOTLY_CONFIG = dict(use_container_width=True, displaylogo=False, include_mathjax="cdn")
@@ -40,6 +95,25 @@ h1, h2, h3, h4, h5, h6 {
 """
 
 
-@st.cache_resource
+# streamlit is only imported by the pages, so that the compute code can be used without it
 def apply_custom_styles() -> None:
+    import streamlit as st
+
     st.markdown(custom_styles, unsafe_allow_html=True)
+
+
+def plotly_chart(fig) -> None:
+    import streamlit as st
+    import diagnostics
+
+    with diagnostics.phase("chart"):
+        st.plotly_chart(fig, **PLOTLY_CONFIG)
+
+
+def show_source(*modules) -> None:
+    import inspect
+    import streamlit as st
+
+    for module in modules:
+        st.markdown(f"`{module.__name__.replace('.', '/')}.py`")
+        st.code(inspect.getsource(module), language="python")
@@ -0,0 +1,190 @@
+"""Timings and cache lookups of a single script rerun.
+
+Recording only happens between `start` and `finish`, which the app calls when
+diagnostics are enabled (see `config.DIAGNOSTICS`). Otherwise every hook below
+returns after a single context variable lookup, so they can stay in the hot path.
+"""
+
+import cProfile
+import io
+import json
+import marshal
+import time
+import zipfile
+from contextvars import ContextVar
+from functools import wraps
+
+import config
+
+
+class Rerun:
+    """Phase timings and cache lookups recorded during one rerun."""
+
+    __slots__ = ("page", "profiled", "start", "total", "phases", "lookups", "calls")
+
+    def __init__(self, page: str, *, profiled: bool = False):
+        self.page = page
+        self.profiled = profiled
+        self.start = time.perf_counter()
+        self.total = None
+        self.phases = {}  # name -> [seconds, count]
+        self.lookups = []  # (function, layer, hit)
+        self.calls = []  # (function, kwargs)
+
+    def add(self, name: str, seconds: float) -> None:
+        entry = self.phases.setdefault(name, [0.0, 0])
+        entry[0] += seconds
+        entry[1] += 1
+
+
+_current: ContextVar[Rerun | None] = ContextVar("rerun", default=None)
+
+
+class _Phase:
+    __slots__ = ("rerun", "name", "start")
+
+    def __init__(self, rerun: Rerun, name: str):
+        self.rerun = rerun
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        self.rerun.add(self.name, time.perf_counter() - self.start)
+
+
+class _Null:
+
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+_NULL = _Null()
+
+
+def start(page: str, *, profiled: bool = False) -> Rerun:
+    rerun = Rerun(page, profiled=profiled)
+    _current.set(rerun)
+    return rerun
+
+
+def finish(rerun: Rerun) -> Rerun:
+    rerun.total = time.perf_counter() - rerun.start
+    _current.set(None)
+    return rerun
+
+
+def phase(name: str):
+    """Context manager adding the time spent inside it to phase `name`."""
+    rerun = _current.get()
+    return _Phase(rerun, name) if rerun is not None else _NULL
+
+
+def timed(name: str):
+    """Decorator adding the time spent in every call to phase `name`."""
+
+    def wrapper(func):
+
+        @wraps(func)
+        def impl(*args, **kwargs):
+            rerun = _current.get()
+            if rerun is None:
+                return func(*args, **kwargs)
+
+            with _Phase(rerun, name):
+                return func(*args, **kwargs)
+
+        return impl
+
+    return wrapper
+
+
+def profiling() -> bool:
+    """Whether the current rerun is being profiled, so its work must stay on the script thread."""
+    rerun = _current.get()
+    return rerun is not None and rerun.profiled
+
+
+def record_lookup(func: str, layer: str, hit: bool) -> None:
+    rerun = _current.get()
+    if rerun is not None:
+        rerun.lookups.append((func, layer, hit))
+
+
+def record_call(func: str, kwargs: dict) -> None:
+    rerun = _current.get()
+    if rerun is not None:
+        rerun.calls.append((func, kwargs))
+
+
+def requested() -> bool:
+    """Whether this rerun should be recorded: always, or when allowed by the query string."""
+    import streamlit as st
+
+    if config.DIAGNOSTICS:
+        return True
+    return (config.DIAGNOSTICS_QUERY_PARAM is not None
+            and st.query_params.get(config.DIAGNOSTICS_QUERY_PARAM) == "1")
+
+
+def profile_requested() -> bool:
+    """Whether this rerun should be profiled: only when allowed and asked for in the query string."""
+    import streamlit as st
+
+    return config.PROFILING and st.query_params.get(config.PROFILE_QUERY_PARAM) == "1"
+
+
+def profile_archive(rerun: Rerun, profiler: cProfile.Profile, query_params: dict) -> bytes:
+    """Zip of the profile (in pstats format) and of the inputs of the profiled rerun."""
+    profiler.create_stats()
+
+    inputs = dict(page=rerun.page,
+                  query_params=query_params,
+                  calls=[dict(function=func, kwargs=kwargs) for func, kwargs in rerun.calls],
+                  total_seconds=rerun.total,
+                  phases={name: seconds for name, (seconds, _) in rerun.phases.items()})
+
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        # same as pstats.Stats.dump_stats, without a temporary file
+        archive.writestr("profile.pstats", marshal.dumps(profiler.stats))
+        archive.writestr("inputs.json", json.dumps(inputs, indent=2, default=str))
+    return buffer.getvalue()
+
+
+def show(rerun: Rerun, profiler: cProfile.Profile | None = None) -> None:
+    """Render the recording of a finished rerun in the sidebar, with a download of its profile."""
+    import streamlit as st
+
+    lines = [f"**{rerun.page}**: {rerun.total * 1000:.1f} ms", ""]
+
+    if rerun.phases:
+        lines += ["| Phase | ms | Calls |", "| --- | ---: | ---: |"]
+        lines += [
+            f"| {name} | {seconds * 1000:.2f} | {count} |"
+            for name, (seconds, count) in rerun.phases.items()
+        ]
+        lines.append("")
+
+    if rerun.lookups:
+        lines += ["| Function | Cache | Result |", "| --- | --- | --- |"]
+        lines += [
+            f"| {func} | {layer} | {'hit' if hit else 'miss'} |" for func, layer, hit in rerun.lookups
+        ]
+
+    with st.sidebar.expander("Diagnostics", expanded=True):
+        st.markdown("\n".join(lines))
+        st.caption("Phases can overlap: generate includes the cache lookups and compute, "
+                   "and compute includes physics.")
+
+        if profiler is not None:
+            st.download_button("Download Profile",
+                               data=profile_archive(rerun, profiler, st.query_params.to_dict()),
+                               file_name=f"profile-{time.strftime('%Y%m%d-%H%M%S')}.zip",
+                               mime="application/zip",
+                               help="profile.pstats (open with pstats or snakeviz) and the "
+                               "inputs of this rerun in inputs.json.")
@@ -0,0 +1,115 @@
+"""Export computed trajectories for offline analysis.
+
+Every format holds the series t, x, y, vx, vy and the speed v of a
+`physics.trajectory.Trajectory`, written straight from its column views to a
+binary file:
+
+- `npz`: a compressed NumPy archive with one array per series.
+- `bin`: a `tables` file of kind "trajectory", i.e. a JSON header followed by
+  the (series, samples) little-endian float64 array, with the names of the
+  series stored in the header under "columns".
+- `csv`: a header line then one sample per line, formatted and written a
+  block of rows at a time so that the whole file never exists as one string.
+
+In a page, `download` computes the trajectory on the job pool only when asked
+to, within the same time limit as the page computations, and writes the file
+to disk before offering it for download, so the trajectory and the file are
+never both held in memory.
+"""
+
+import tempfile
+
+import numpy as np
+
+import config
+import jobs
+import tables
+from physics import budget
+
+COLUMNS = ("t", "x", "y", "vx", "vy", "v")
+
+# stored in the header of binary exports: change whenever the columns change
+VERSION = 1
+
+FORMATS = {
+    "csv": "CSV",
+    "npz": "Compressed NumPy (.npz)",
+    "bin": "Binary (float64 with JSON header)",
+}
+
+MIME_TYPES = {"csv": "text/csv", "npz": "application/octet-stream", "bin": "application/octet-stream"}
+
+# rows of a CSV formatted at once
+CSV_BLOCK = 65536
+
+
+def _series(traj, start: int = 0, stop: int | None = None) -> list[np.ndarray]:
+    t, x, y, vx, vy = (traj.column(name)[start:stop] for name in COLUMNS[:-1])
+    return [t, x, y, vx, vy, np.hypot(vx, vy)]
+
+
+def write_npz(file, traj) -> None:
+    np.savez_compressed(file, **dict(zip(COLUMNS, _series(traj))))
+
+
+def write_bin(file, traj) -> None:
+    tables.write_rows(file, _series(traj), kind="trajectory", version=VERSION, columns=COLUMNS)
+
+
+def write_csv(file, traj, *, block: int = CSV_BLOCK) -> None:
+    # shortest repr that reads back as the same float
+    line = ",".join(["%r"] * len(COLUMNS)) + "\n"
+
+    file.write((",".join(COLUMNS) + "\n").encode())
+    for start in range(0, len(traj), block):
+        rows = np.stack(_series(traj, start, start + block), axis=1).tolist()
+        file.write("".join([line % tuple(row) for row in rows]).encode())
+
+
+WRITERS = {"csv": write_csv, "npz": write_npz, "bin": write_bin}
+
+
+def _compute(*, export, **kwargs):
+    # exports are not cached, so they get the deadline the page computations get from `cache`
+    with budget.deadline(config.COMPUTE_TIMEOUT):
+        return export(**kwargs)
+
+
+def download(key: str, func, /, *, name: str, text: str = "Computing...", **kwargs) -> None:
+    """Controls to export the trajectory returned by `func(**kwargs)`, computed only when asked for."""
+    import streamlit as st
+
+    extension = st.selectbox("Export Format",
+                             options=FORMATS,
+                             format_func=FORMATS.get,
+                             key=f"{key}_format")
+    job_key = f"{key}_job"
+    if not st.button("Prepare Export", key=f"{key}_prepare"):
+        # any other rerun (e.g. for new inputs) stops an export still in progress
+        job = st.session_state.pop(job_key, None)
+        if job is not None:
+            job.cancel()
+        return
+
+    job = jobs.latest(job_key, _compute, export=func, **kwargs)
+    try:
+        traj = jobs.result(job, text=text)
+    finally:
+        # dropped from the session (and stopped, if the rerun was interrupted), so the trajectory is
+        # released as soon as it is written out; only the finished file is then read back, as
+        # Streamlit serves downloads from memory
+        st.session_state.pop(job_key, None)
+        job.cancel()
+        del job  # its future holds the trajectory too
+
+    with tempfile.TemporaryFile() as file:
+        WRITERS[extension](file, traj)
+        del traj
+        file.seek(0)
+        data = file.read()
+
+    st.download_button(f"Download {name}.{extension}",
+                       data=data,
+                       file_name=f"{name}.{extension}",
+                       mime=MIME_TYPES[extension],
+                       key=f"{key}_download")
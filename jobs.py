@@ -0,0 +1,91 @@
+"""Heavy computations run in the background on a bounded pool of threads.
+
+`submit` starts a function on the pool and returns a `Job`, which records the
+progress reported by the physics loops (see `physics.budget`) and can be
+cancelled. In a page, `latest` keeps one job per session and key, cancelling
+the previous job when the inputs change, and `result` shows its progress
+until it finishes. While a rerun is being profiled, jobs run inline on the
+script thread instead, as the profiler only sees the thread it was enabled on.
+"""
+
+import contextvars
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+
+import config
+import diagnostics
+from physics import budget
+
+_pool = ThreadPoolExecutor(max_workers=config.COMPUTE_WORKERS, thread_name_prefix="compute")
+
+
+class Job:
+    """A computation submitted to the pool."""
+
+    __slots__ = ("kwargs", "future", "progress", "_cancelled")
+
+    def __init__(self, kwargs: dict):
+        self.kwargs = kwargs
+        self.future: Future | None = None
+        self.progress = 0.0
+        self._cancelled = threading.Event()
+
+    def report(self, fraction: float) -> None:
+        self.progress = fraction
+
+    def cancel(self) -> None:
+        """Drop the job if it has not started yet, or stop it at its next check."""
+        self._cancelled.set()
+        self.future.cancel()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+
+def _run(job: Job, func, kwargs: dict):
+    with budget.watch(cancelled=job._cancelled, report=job.report):
+        budget.check()  # cancelled while queued
+        return func(**kwargs)
+
+
+def submit(func, /, **kwargs) -> Job:
+    """Run `func(**kwargs)` on the pool, in a copy of the caller's context (so diagnostics still record it)."""
+    job = Job(kwargs)
+    if diagnostics.profiling():
+        job.future = Future()
+        try:
+            job.future.set_result(_run(job, func, kwargs))
+        except Exception as e:
+            job.future.set_exception(e)
+        return job
+
+    job.future = _pool.submit(contextvars.copy_context().run, _run, job, func, kwargs)
+    return job
+
+
+def latest(key: str, func, /, **kwargs) -> Job:
+    """The session's job for `key`: reused if its inputs are unchanged, otherwise cancelled and replaced."""
+    import streamlit as st
+
+    job = st.session_state.get(key)
+    if job is not None and job.kwargs == kwargs and not job.cancelled:
+        return job
+
+    if job is not None:
+        job.cancel()
+    job = st.session_state[key] = submit(func, **kwargs)
+    return job
+
+
+def result(job: Job, *, text: str = "Computing..."):
+    """Wait for the job with a progress bar, then return its result (or raise its exception)."""
+    import streamlit as st
+
+    if not job.future.done():
+        bar = st.progress(0.0, text=text)
+        while not wait([job.future], timeout=config.PROGRESS_INTERVAL).done:
+            bar.progress(job.progress, text=text)
+        bar.empty()
+
+    return job.future.result()
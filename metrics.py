@@ -0,0 +1,158 @@
+"""Process-wide counters and histograms, served in the Prometheus text format.
+
+Recording is always on and only costs a lock and a few additions. The values
+are published by `serve`, which the app starts when `config.METRICS_PORT` is
+set, at http://<METRICS_ADDRESS>:<METRICS_PORT>/metrics.
+"""
+
+import logging
+import threading
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: tuple) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+
+def _format_value(value: float) -> str:
+    return "+Inf" if value == float("inf") else repr(float(value))
+
+
+class Counter:
+
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self._values = {}  # sorted label items -> value
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, value in self._values.items():
+                lines.append(f"{self.name}{_format_labels(labels)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+
+    def __init__(self, name: str, help: str, buckets):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(sorted(buckets)) + (float("inf"), )
+        self._values = {}  # sorted label items -> [bucket counts, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * len(self.buckets), 0.0]
+            entry[0][bisect_left(self.buckets, value)] += 1
+            entry[1] += value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for labels, (counts, total) in self._values.items():
+                cumulative = 0
+                for bound, count in zip(self.buckets, counts):
+                    cumulative += count
+                    bucket_labels = labels + (("le", _format_value(bound)), )
+                    lines.append(f"{self.name}_bucket{_format_labels(bucket_labels)} {cumulative}")
+                lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(total)}")
+                lines.append(f"{self.name}_count{_format_labels(labels)} {cumulative}")
+        return lines
+
+
+compute_seconds = Histogram("bpho_compute_seconds",
+                            "Time taken to compute a page's results (cache misses only).",
+                            buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1,
+                                     2.5, 5, 10, 30))
+integration_steps = Histogram("bpho_integration_steps",
+                              "Time steps (or bounce arcs) computed per numerical solution.",
+                              buckets=(10, 100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000))
+figure_payload_bytes = Histogram("bpho_figure_payload_bytes",
+                                 "Size of the JSON of each computed figure.",
+                                 buckets=(4 * 1024, 16 * 1024, 64 * 1024, 256 * 1024, 1024**2,
+                                          4 * 1024**2, 16 * 1024**2, 64 * 1024**2))
+
+_metrics = [compute_seconds, integration_steps, figure_payload_bytes]
+_collectors = []
+
+
+def register_collector(collect) -> None:
+    """Add a function returning (name, type, help, [(labels dict, value)]) tuples read on every scrape."""
+    _collectors.append(collect)
+
+
+def render() -> str:
+    lines = []
+    for metric in _metrics:
+        lines += metric.render()
+
+    for collect in _collectors:
+        for name, kind, help, samples in collect():
+            lines += [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+            lines += [
+                f"{name}{_format_labels(tuple(sorted(labels.items())))} {_format_value(value)}"
+                for labels, value in samples
+            ]
+
+    return "\n".join(lines) + "\n"
+
+
+class _Handler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+
+        body = render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # scrapes would otherwise fill the server log
+
+
+_server = None
+_server_started = False
+_server_lock = threading.Lock()
+
+
+def serve(address: str, port: int) -> ThreadingHTTPServer | None:
+    """Start serving /metrics from a daemon thread, once per process (None if the port is taken)."""
+    global _server, _server_started
+    with _server_lock:
+        if not _server_started:
+            _server_started = True
+            try:
+                _server = ThreadingHTTPServer((address, port), _Handler)
+            except OSError as e:
+                logging.getLogger(__name__).warning("metrics server not started: %s", e)
+            else:
+                _server.daemon_threads = True
+                threading.Thread(target=_server.serve_forever, name="metrics", daemon=True).start()
+    return _server
+
+
+def serving() -> bool:
+    return _server is not None
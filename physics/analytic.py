@@ -0,0 +1,139 @@
+"""Exact ("analytical") results for drag-free projectile motion.
+
+Angles are in degrees. Every function works elementwise on NumPy arrays as well
+as on scalars, so whole parameter grids can be evaluated in one call.
+"""
+
+import numpy as np
+
+from physics.trajectory import Trajectory
+
+
+def components(*, theta, u):
+    """Horizontal and vertical components of the launch velocity."""
+    rad = np.radians(theta)
+    return u * np.cos(rad), u * np.sin(rad)
+
+
+def position(t, *, theta, u, h, g):
+    """(x, y) of the projectile at time `t` after launch."""
+    ux, uy = components(theta=theta, u=u)
+    return ux * t, h + uy * t - (g / 2) * t**2
+
+
+def flight_time(*, theta, u, h, g):
+    """Time taken to fall back to y = 0."""
+    _, uy = components(theta=theta, u=u)
+    return (uy + np.sqrt(uy**2 + 2 * g * h)) / g
+
+
+def apogee(*, theta, u, h, g):
+    """(x, y) of the highest point of the trajectory."""
+    ux, uy = components(theta=theta, u=u)
+    return ux * uy / g, h + (uy**2) / 2 / g
+
+
+def trajectory(t, *, theta, u, h, g) -> Trajectory:
+    """Path of a single launch at times `t` (an array), with its apogee and range."""
+    ux, uy = components(theta=theta, u=u)
+    t = np.asarray(t, dtype=float)
+    x, y = position(t, theta=theta, u=u, h=h, g=g)
+
+    traj = Trajectory.from_columns(t=t, x=x, y=y, vx=ux, vy=uy - g * t)
+    total_t = flight_time(theta=theta, u=u, h=h, g=g)
+    xa, ya = apogee(theta=theta, u=u, h=h, g=g)
+    traj.mark("apogee", t=uy / g, x=xa, y=ya)
+    traj.mark("range", t=total_t, x=ux * total_t, y=0.0)
+    return traj
+
+
+def height_at(x, *, theta, u, h, g):
+    """y as a function of x along the trajectory."""
+    ux, uy = components(theta=theta, u=u)
+    return h + (uy / ux) * x - (g / 2 / ux**2) * x**2
+
+
+def height_at_tan(x, *, tan_theta, u, h, g):
+    """y as a function of x, for a launch angle given by its tangent."""
+    return h + x * tan_theta - x**2 * g * (1 + tan_theta**2) / 2 / u**2
+
+
+def landing_distance(*, tan_theta, u, h, g):
+    """x at which a trajectory launched at arctan(`tan_theta`) reaches y = 0."""
+    a = g * (1 + tan_theta**2) / 2 / u**2
+    return (tan_theta + np.sqrt(tan_theta**2 + 4 * h * a)) / 2 / a
+
+
+def max_range_angle(*, u, h, g):
+    """Launch angle that maximizes the horizontal range."""
+    return np.degrees(np.arcsin(1 / np.sqrt(2 + 2 * g * h / u**2)))
+
+
+def max_range(*, u, h, g):
+    """Largest horizontal range for launch speed `u` from height `h`."""
+    return u / g * np.sqrt(u**2 + 2 * g * h)
+
+
+def max_range_height(x, *, u, h, g):
+    """y as a function of x along the trajectory of maximum range."""
+    R = max_range(u=u, h=h, g=g)
+    return x * (-h + np.sqrt(R**2 + h**2)) / R - x**2 * np.sqrt(R**2 + h**2) / R**2 + h
+
+
+def bounding_parabola(x, *, u, h, g):
+    """Highest point reachable at horizontal distance `x` with launch speed `u`."""
+    return u**2 / (2 * g) - g / (2 * u**2) * x**2 + h
+
+
+def _arc_integral(z):
+    # antiderivative of sqrt(1 + z^2); asinh(z) = log(sqrt(1 + z^2) + z) without cancellation for z << 0
+    return 0.5 * np.arcsinh(z) + 0.5 * z * np.sqrt(1 + z**2)
+
+
+def arc_length(x, *, theta, u, g):
+    """Distance travelled along the trajectory up to horizontal distance `x`."""
+    tan_theta = np.tan(np.radians(theta))
+    z1 = tan_theta
+    z2 = tan_theta - g * x / u**2 * (1 + tan_theta**2)
+    return u**2 / g / (1 + tan_theta**2) * (_arc_integral(z1) - _arc_integral(z2))
+
+
+def min_speed_to_target(*, X, Y, h, g):
+    """Minimum launch speed to pass through (X, Y), and the tangent of its launch angle."""
+    dy = Y - h
+    min_u = np.sqrt(g) * np.sqrt(dy + np.sqrt(X**2 + dy**2))
+    # since only tan(theta) is used in the equation for the parabola, we can optimize by not taking atan
+    min_tan_theta = (dy + np.sqrt(X**2 + dy**2)) / X
+    return min_u, min_tan_theta
+
+
+def target_tan_angles(*, X, Y, u, h, g):
+    """Tangents of the low and high ball launch angles passing through (X, Y)."""
+    a = g / 2 / u**2 * X**2
+    b = -X
+    c = Y - h + g / 2 / u**2 * X**2
+
+    root = np.sqrt(b**2 - 4 * a * c)
+    return (-b - root) / 2 / a, (-b + root) / 2 / a
+
+
+def range_from_origin(t, *, theta, u, g):
+    """Straight-line distance r from the launch point at time `t`."""
+    _, uy = components(theta=theta, u=u)
+    return np.sqrt(u**2 * t**2 - g * t**3 * uy + g**2 * t**4 / 4)
+
+
+def range_extrema_times(*, theta, u, g):
+    """Times of the two stationary points of r (earlier first), which exist above about 70.5 deg."""
+    sin_theta = np.sin(np.radians(theta))
+    root = np.sqrt(sin_theta**2 - 8 / 9)
+    return 3 * u / 2 / g * (sin_theta - root), 3 * u / 2 / g * (sin_theta + root)
+
+
+# launch angle at which the minimum and maximum of r merge into a saddle point
+SADDLE_ANGLE = np.degrees(np.arcsin(2 * np.sqrt(2) / 3))
+
+
+def saddle_time(*, u, g):
+    """Time of the saddle point of r when launched at `SADDLE_ANGLE`."""
+    return u / g * np.sqrt(2)
@@ -0,0 +1,230 @@
+"""Drag-free projectile bouncing on flat ground, solved in closed form.
+
+Between bounces the motion is an exact parabola, so every impact can be
+computed directly instead of being detected by stepping through time. The
+time-stepped Verlet model is kept alongside for comparison.
+"""
+
+from math import sqrt, radians, sin, cos, log, floor, inf
+from typing import NamedTuple
+
+import numpy as np
+
+from physics import budget
+from physics.trajectory import Trajectory
+
+
+class BounceArcs(NamedTuple):
+    """The parabolic arcs of a bouncing projectile.
+
+    Arc i starts at time `t[i]` from (`x[i]`, `y[i]`) with vertical velocity
+    `vy[i]` and lasts `duration[i]`, ending with impact number i + 1. The
+    horizontal velocity `ux` is the same for every arc. The motion ends at
+    `end_t`, which may be later than the last arc when the remaining bounces
+    are too small to draw and the ball is treated as rolling along the ground.
+    When there were more arcs to draw than `bounce_arcs` returns (`clipped`),
+    the motion is only described up to the end of the last arc, `shown_t`.
+    """
+
+    g: float
+    ux: float
+    t: np.ndarray
+    x: np.ndarray
+    y: np.ndarray
+    vy: np.ndarray
+    duration: np.ndarray
+    end_t: float
+    rest_t: float
+    clipped: bool = False
+
+    @property
+    def total_t(self) -> float:
+        return self.end_t
+
+    @property
+    def shown_t(self) -> float:
+        """End of the motion described by the arcs: `end_t`, or the last impact when clipped."""
+        return self.t[-1] + self.duration[-1] if self.clipped else self.end_t
+
+    @property
+    def rest_x(self) -> float:
+        return self.ux * self.rest_t
+
+    @property
+    def impacts(self) -> np.ndarray:
+        """Times of every drawn impact with the ground."""
+        return self.t + self.duration
+
+    @property
+    def apogees(self) -> np.ndarray:
+        """Highest point reached on each arc."""
+        rising = np.maximum(self.vy, 0)
+        return self.y + rising**2 / 2 / self.g
+
+    def _arc(self, t: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        # arc of each time, and the time since the arc started (after the last arc, the ball rolls)
+        i = np.clip(np.searchsorted(self.t, t, side="right") - 1, 0, len(self.t) - 1)
+        return i, np.minimum(t - self.t[i], self.duration[i])
+
+    def position(self, t) -> tuple[np.ndarray, np.ndarray]:
+        """(x, y) at times `t` between launch and `shown_t`."""
+        t = np.asarray(t, dtype=float)
+        i, dt = self._arc(t)
+
+        x = self.ux * t
+        y = np.maximum(self.y[i] + self.vy[i] * dt - self.g / 2 * dt**2, 0)
+        return x, y
+
+    def velocity(self, t) -> tuple[np.ndarray, np.ndarray]:
+        """(vx, vy) at times `t` between launch and `shown_t`, rebounding at each impact but the last."""
+        t = np.asarray(t, dtype=float)
+        i, dt = self._arc(t)
+        rolling = t - self.t[i] > self.duration[i] + 1e-9 * self.end_t  # end_t may round past the last impact
+        return np.full_like(t, self.ux), np.where(rolling, 0.0, self.vy[i] - self.g * dt)
+
+    def trajectory(self, n: int) -> Trajectory:
+        """Path at about `n` evenly spaced times over the whole motion, plus every impact.
+
+        Including the impacts keeps the sampled path touching the ground at
+        each bounce however coarse the sampling is. Each impact is also marked
+        as an event.
+        """
+        t = np.union1d(np.linspace(0, self.shown_t, n), self.impacts)
+        x, y = self.position(t)
+        vx, vy = self.velocity(t)
+        traj = Trajectory.from_columns(t=t, x=x, y=y, vx=vx, vy=vy)
+        for impact in self.impacts:
+            traj.mark("impact", t=impact, x=self.ux * impact, y=0.0)
+        return traj
+
+
+def bounce_arcs(*,
+                theta: float,
+                g: float,
+                u: float,
+                h: float,
+                C: float,
+                N: int | float,
+                min_height: float = 0.0,
+                max_arcs: int = 1000) -> BounceArcs:
+    """Compute the first `N` bounces of a projectile with coefficient of restitution `C`.
+
+    The first impact comes from solving y(t) = 0. After it, the ball leaves the
+    ground with speed `C**k * v1` after impact k, where `v1` is the first
+    impact speed, so bounce times form a geometric series. This gives the time
+    of the N-th impact, and the time to come to rest (`N = inf`), in closed
+    form and in constant time for any N.
+
+    Only arcs rising at least `min_height` are returned, up to `max_arcs` of
+    them. Smaller bounces are treated as rolling along the ground, though their
+    time is still included in `end_t`. Larger bounces past the first `max_arcs`
+    are not: the result is then `clipped` at the end of the last arc.
+    """
+    if g <= 0:
+        raise ValueError("gravity must be positive for the projectile to bounce")
+    if h < 0:
+        raise ValueError("launch height must not be negative")
+    if N < 1:
+        raise ValueError("at least one bounce is required")
+    if N == inf and C >= 1:
+        raise ValueError("a projectile with C >= 1 never comes to rest")
+
+    rad = radians(theta)
+    ux = u * cos(rad)
+    uy = u * sin(rad)
+
+    first = (uy + sqrt(uy**2 + 2 * g * h)) / g
+    v1 = g * first - uy  # speed of the first impact
+    period = 2 * v1 / g  # duration of an arc rebounding at v1
+
+    # k-th rebound leaves at C**k * v1 and lasts C**k * period
+    if C >= 1:
+        end_t = first + period * C * (N - 1)
+        rest_t = inf
+    else:
+        end_t = first + period * C * (1 - C**(N - 1)) / (1 - C)
+        rest_t = first + period * C / (1 - C)
+
+    # number of rebounds rising at least min_height: (C**k * v1)**2 / 2g >= min_height
+    visible = N - 1
+    if 0 < C < 1 and min_height > 0 and v1 > 0:
+        visible = min(visible, floor(log(sqrt(2 * g * min_height) / v1) / log(C)))
+    elif C == 0 or v1 == 0:
+        visible = 0
+    n_arcs = int(min(1 + max(visible, 0), max_arcs))
+    clipped = 1 + visible > max_arcs
+
+    k = np.arange(n_arcs)
+    rebound = v1 * np.float64(C)**k
+    duration = period * np.float64(C)**k
+    duration[0] = first
+    t = np.concatenate([[0.0], np.cumsum(duration[:-1])])
+
+    y = np.zeros(n_arcs)
+    y[0] = h
+    vy = rebound
+    vy[0] = uy
+
+    return BounceArcs(g=g,
+                      ux=ux,
+                      t=t,
+                      x=ux * t,
+                      y=y,
+                      vy=vy,
+                      duration=duration,
+                      end_t=end_t,
+                      rest_t=rest_t,
+                      clipped=clipped)
+
+
+def verlet_bounces(*, theta: float, g: float, u: float, h: float, dt: float, C: float, N: int,
+                   min_height: float, max_steps: float = float("inf")) -> Trajectory:
+    """Step the bouncing projectile with the Verlet method, marking every impact.
+
+    Stops before the N-th bounce once the ball is rolling (see below), or after
+    `max_steps` steps.
+    """
+    rad = radians(theta)
+
+    ux = u * cos(rad)
+    uy = u * sin(rad)
+
+    traj = Trajectory(("t", "x", "y", "vx", "vy"))
+    append = traj.append
+    total_t = 0
+
+    x = 0
+    y = h
+
+    dx = ux * dt
+
+    steps = 0
+    bounces = 0
+    rebound = float("inf")
+    rolling = False
+    while bounces < N and not rolling and steps < max_steps:
+        if not steps % budget.CHECK_EVERY:
+            budget.check(total_t)
+        x = x + dx  # since x acceleration is 0, dx is constant
+        y = y + uy * dt
+
+        uy = uy - g * dt
+
+        if y < 0:
+            y = 0
+            uy = -uy * C
+            bounces += 1
+            traj.mark("impact", t=total_t + dt, x=x, y=0.0)
+
+            # clamping to y = 0 feeds the ball energy on the order of g dt² per bounce, so a coarse step
+            # can hold it bouncing a few g dt² high instead of coming to rest: with C < 1, a bounce
+            # that low and no lower than the last is treated as rolling, like one below min_height
+            height = uy**2 / 2 / g
+            rolling = height < min_height or (C < 1 and uy >= rebound and height < 10 * g * dt**2)
+            rebound = uy
+
+        total_t += dt
+        steps += 1
+        append(total_t, x, y, ux, uy)
+
+    return traj
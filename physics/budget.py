@@ -0,0 +1,104 @@
+"""Limits on the work done by a single computation.
+
+Inputs are checked before any work starts: `require` refuses work estimated
+to be too large. Long-running loops call `check` every `CHECK_EVERY`
+iterations, which raises `ComputeTimeout` once the deadline set with
+`deadline` has passed, or `Cancelled` once the job watching the computation
+(see `watch`) is cancelled, so the computation stops cleanly between steps.
+Loops pass their simulated time to `check`, which reports it to the job as a
+fraction of the duration set with `expect`.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# iterations between deadline checks in the integration loops
+CHECK_EVERY = 4096
+
+
+class BudgetExceeded(ValueError):
+    """The inputs would need more steps or memory than allowed."""
+
+
+class ComputeTimeout(TimeoutError):
+    """The computation ran past its deadline and was stopped."""
+
+
+class Cancelled(Exception):
+    """The computation was no longer needed and was stopped."""
+
+
+_deadline: ContextVar[float | None] = ContextVar("deadline", default=None)
+_watch: ContextVar[tuple | None] = ContextVar("watch", default=None)  # (cancelled event, report)
+_span: ContextVar[float | None] = ContextVar("span", default=None)
+
+
+@contextmanager
+def deadline(seconds: float | None):
+    """Stop computations in this context after `seconds` (no limit for None)."""
+    token = _deadline.set(time.monotonic() + seconds if seconds else None)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+@contextmanager
+def watch(*, cancelled: threading.Event, report):
+    """Stop computations in this context once `cancelled` is set, and pass their progress to `report`."""
+    token = _watch.set((cancelled, report))
+    try:
+        yield
+    finally:
+        _watch.reset(token)
+
+
+@contextmanager
+def expect(duration: float | None):
+    """Report the progress of loops in this context as their simulated time over `duration`."""
+    token = _span.set(duration if duration and duration > 0 else None)
+    try:
+        yield
+    finally:
+        _span.reset(token)
+
+
+def check(t: float | None = None) -> None:
+    """Stop the computation if it is past its deadline or cancelled; `t` is its simulated time so far."""
+    expires = _deadline.get()
+    if expires is not None and time.monotonic() > expires:
+        raise ComputeTimeout("the computation took too long and was stopped; "
+                             "try a larger time step or a cheaper method")
+
+    watching = _watch.get()
+    if watching is not None:
+        cancelled, report = watching
+        if cancelled.is_set():
+            raise Cancelled("the computation was replaced by a newer one")
+
+        span = _span.get()
+        if t is not None and span is not None:
+            report(min(t / span, 1.0))
+
+
+def require(*, steps: float, max_steps: int, nbytes: float = 0, max_bytes: int | None = None):
+    """Raise `BudgetExceeded` if an estimate of the work is over its limit."""
+    if steps == float("inf"):
+        raise BudgetExceeded("needs an unbounded number of steps")
+    if not steps <= max_steps:  # also catches NaN
+        raise BudgetExceeded(f"needs about {steps:,.0f} steps, more than the limit of {max_steps:,}")
+    if max_bytes is not None and nbytes > max_bytes:
+        raise BudgetExceeded(f"needs about {nbytes / 1024**2:,.0f} MiB, "
+                             f"more than the limit of {max_bytes / 1024**2:,.0f} MiB")
+
+
+def verlet_bytes(*, steps: float, launches: int) -> float:
+    """Peak memory of a recorded `drag.integrate_verlet` run (its history doubles as it grows)."""
+    return 2 * steps * launches * 4 * 8
+
+
+def trajectory_bytes(*, steps: float, columns: int) -> float:
+    """Peak memory of a `Trajectory` of `steps` rows (its buffer doubles as it grows)."""
+    return 2 * steps * columns * 8
@@ -0,0 +1,382 @@
+"""Projectile motion with air resistance proportional to the square of velocity.
+
+The integrators here work on plain NumPy arrays and never touch Streamlit or
+Plotly, so they can be shared by the pages, batch jobs and benchmarks.
+"""
+
+from math import sqrt
+from typing import NamedTuple
+
+import numpy as np
+
+from physics import budget
+from physics.trajectory import Trajectory
+
+# columns of a state array
+X, Y, VX, VY = range(4)
+
+
+def drag_factor(*, Cd, P, a, m):
+    """Air resistance factor k = Cd * P * a / (2m). Accepts scalars or arrays."""
+    return Cd * P * a / m / 2
+
+
+class DragBatch(NamedTuple):
+    """Result of integrating N launches at once.
+
+    `steps[i]` is the number of states recorded for launch i while it was above
+    the ground, so its flight time is `steps[i] * dt`. When integrated with
+    `record=True`, `states` has shape (max(steps), N, 4) and is NaN-padded once
+    a launch has landed.
+    """
+
+    dt: float
+    steps: np.ndarray
+    apogee: np.ndarray
+    final: np.ndarray
+    states: np.ndarray | None
+
+    @property
+    def flight_time(self) -> np.ndarray:
+        return self.steps * self.dt
+
+    @property
+    def range(self) -> np.ndarray:
+        return self.final[:, X]
+
+    def trajectory(self, i: int = 0) -> Trajectory:
+        """Recorded path of launch i, with its apogee and range."""
+        if self.states is None:
+            raise ValueError("trajectory was not recorded; integrate with record=True")
+
+        n = self.steps[i]
+        # a launch that never left the ground is only its initial state
+        x, y, vx, vy = self.states[:n, i].T if n else self.final[i, :, None]
+        traj = Trajectory.from_columns(t=np.arange(max(n, 1)) * self.dt, x=x, y=y, vx=vx, vy=vy)
+        traj.mark("apogee", x=self.apogee[i, X], y=self.apogee[i, Y])
+        traj.mark("range", t=self.flight_time[i], x=self.range[i], y=0.0)
+        return traj
+
+
+def _launch_arrays(**params) -> tuple[np.ndarray, ...]:
+    arrays = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in params.values()))
+    return tuple(np.ravel(arr) for arr in arrays)
+
+
+# below this many launches, ufunc dispatch per step costs more than plain floats
+_SCALAR_MAX_LAUNCHES = 8
+
+
+def _verlet_single(x: float, y: float, vx: float, vy: float, g: float, k: float, dt: float,
+                   max_steps: float) -> tuple[Trajectory, bool]:
+    # states while in the air, and whether the launch landed within max_steps
+    states = Trajectory(("x", "y", "vx", "vy"))
+    append = states.append
+    half_dt2 = dt**2 / 2
+
+    # a launch from the ground is in the air if it is aimed upward
+    i = 0
+    while y > 0 or (i == 0 and y == 0 and vy > 0):
+        if i == max_steps:
+            return states, False
+        if not i % budget.CHECK_EVERY:
+            budget.check(i * dt)
+        append(x, y, vx, vy)
+        i += 1
+
+        v = sqrt(vx**2 + vy**2)
+        ax = -vx * v * k
+        ay = -g - vy * v * k
+        x += vx * dt + ax * half_dt2
+        y += vy * dt + ay * half_dt2
+        vx += ax * dt
+        vy += ay * dt
+
+    return states, True
+
+
+def integrate_verlet(*,
+                     theta,
+                     u,
+                     h,
+                     g,
+                     k,
+                     dt: float,
+                     record: bool = True,
+                     max_steps: float = float("inf")) -> DragBatch:
+    """Integrate a batch of drag trajectories with a fixed time step.
+
+    `theta` (deg), `u`, `h`, `g` and `k` may be scalars or arrays; they are
+    broadcast against each other and flattened into N launches. Every step
+    advances all launches still in the air as one (N, 4) array of
+    (x, y, vx, vy), and launches drop out of the batch as soon as they reach
+    the ground. A launch from the ground (h = 0) is in the air if it is aimed
+    upward. Pass `record=False` to keep only the summary (flight time,
+    apogee, last state) when the full history is not needed. Launches still
+    in the air after `max_steps` steps are stopped there, with NaN for their
+    apogee and last state.
+    """
+    theta, u, h, g, k = _launch_arrays(theta=theta, u=u, h=h, g=g, k=k)
+    rad = np.radians(theta)
+    n = rad.size
+
+    if n <= _SCALAR_MAX_LAUNCHES:
+        return _integrate_scalar(rad, u, h, g, k, dt, record, max_steps)
+
+    state = np.zeros((n, 4))
+    state[:, Y] = h
+    state[:, VX] = u * np.cos(rad)
+    state[:, VY] = u * np.sin(rad)
+
+    steps = np.zeros(n, dtype=np.int64)
+    apogee = state[:, :2].copy()
+    final = state.copy()
+
+    # launches still in the air, and their states/parameters in the same order
+    active = np.flatnonzero((state[:, Y] > 0) | ((state[:, Y] == 0) & (state[:, VY] > 0)))
+    s = state[active]
+    g_active = g[active]
+    k_active = k[active]
+    apogee_active = apogee[active]
+
+    # grown by doubling, so tiny time steps only pay for the history they use
+    history = np.full((1024, n, 4), np.nan) if record else None
+
+    half_dt2 = dt**2 / 2
+    i = 0
+    while active.size and i < max_steps:
+        if not i % budget.CHECK_EVERY:
+            budget.check(i * dt)
+        if record:
+            if i == len(history):
+                history = np.concatenate([history, np.full_like(history, np.nan)])
+            history[i, active] = s
+
+        higher = s[:, Y] > apogee_active[:, 1]
+        apogee_active[higher] = s[higher, :2]
+
+        v = np.hypot(s[:, VX], s[:, VY])
+        acc = -(k_active * v)[:, None] * s[:, VX:]
+        acc[:, 1] -= g_active
+
+        stepped = s.copy()
+        stepped[:, :VX] += s[:, VX:] * dt + acc * half_dt2
+        stepped[:, VX:] += acc * dt
+        i += 1
+
+        landed = stepped[:, Y] <= 0
+        if landed.any():
+            done = active[landed]
+            steps[done] = i
+            final[done] = s[landed]
+            apogee[done] = apogee_active[landed]
+
+            airborne = ~landed
+            active = active[airborne]
+            stepped = stepped[airborne]
+            g_active = g_active[airborne]
+            k_active = k_active[airborne]
+            apogee_active = apogee_active[airborne]
+
+        s = stepped
+
+    steps[active] = i
+    apogee[active] = final[active] = np.nan
+
+    if record:
+        history = history[:steps.max(initial=0)]
+
+    return DragBatch(dt=dt, steps=steps, apogee=apogee, final=final, states=history)
+
+
+def _integrate_scalar(rad, u, h, g, k, dt, record, max_steps) -> DragBatch:
+    n = rad.size
+    ux = u * np.cos(rad)
+    uy = u * np.sin(rad)
+
+    runs, landed = [], np.empty(n, dtype=bool)
+    for i in range(n):
+        run, landed[i] = _verlet_single(0.0, h[i], ux[i], uy[i], g[i], k[i], dt, max_steps)
+        runs.append(run.array().T)
+
+    steps = np.array([len(run) for run in runs], dtype=np.int64)
+    apogee = np.stack([np.zeros(n), h], axis=1)
+    final = np.stack([np.zeros(n), h, ux, uy], axis=1)
+
+    for i, run in enumerate(runs):
+        if len(run):
+            apogee[i] = run[np.argmax(run[:, Y]), :VX]
+            final[i] = run[-1]
+    apogee[~landed] = final[~landed] = np.nan
+
+    history = None
+    if record:
+        history = np.full((steps.max(initial=0), n, 4), np.nan)
+        for i, run in enumerate(runs):
+            history[:len(run), i] = run
+
+    return DragBatch(dt=dt, steps=steps, apogee=apogee, final=final, states=history)
+
+
+# Dormand-Prince 5(4) tableau, with the 4th order dense output of Shampine (1986)
+_DP_C = np.array([0, 1 / 5, 3 / 10, 4 / 5, 8 / 9, 1])
+_DP_A = (
+    (),
+    (1 / 5, ),
+    (3 / 40, 9 / 40),
+    (44 / 45, -56 / 15, 32 / 9),
+    (19372 / 6561, -25360 / 2187, 64448 / 6561, -212 / 729),
+    (9017 / 3168, -355 / 33, 46732 / 5247, 49 / 176, -5103 / 18656),
+)
+_DP_B = np.array([35 / 384, 0, 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84])
+_DP_E = np.array([-71 / 57600, 0, 71 / 16695, -71 / 1920, 17253 / 339200, -22 / 525, 1 / 40])
+_DP_P = np.array([
+    [1, -8048581381 / 2820520608, 8663915743 / 2820520608, -12715105075 / 11282082432],
+    [0, 0, 0, 0],
+    [0, 131558114200 / 32700410799, -68118460800 / 10900136933, 87487479700 / 32700410799],
+    [0, -1754552775 / 470086768, 14199869525 / 1410260304, -10690763975 / 1880347072],
+    [0, 127303824393 / 49829197408, -318862633887 / 49829197408, 701980252875 / 199316789632],
+    [0, -282668133 / 205662961, 2019193451 / 616988883, -1453857185 / 822651844],
+    [0, 40617522 / 29380423, -110615467 / 29380423, 69997945 / 29380423],
+])
+
+
+class DragSolution(NamedTuple):
+    """Continuous solution of a single launch from `integrate_rk45`.
+
+    Step `i` covers [t[i], t[i + 1]] and is interpolated with the quartic
+    `states[i] + dt * q[i] @ (s, s^2, s^3, s^4)`, where `s` is the fraction of
+    the step elapsed. The last step ends exactly on the ground.
+    """
+
+    t: np.ndarray
+    states: np.ndarray
+    q: np.ndarray
+    apogee: tuple[float, float]
+
+    @property
+    def steps(self) -> int:
+        return len(self.q)
+
+    @property
+    def flight_time(self) -> float:
+        return self.t[-1]
+
+    @property
+    def range(self) -> float:
+        return self.states[-1, X]
+
+    def sample(self, t) -> np.ndarray:
+        """Interpolated (x, y, vx, vy) at times `t` within the flight."""
+        t = np.asarray(t, dtype=float)
+        i = np.clip(np.searchsorted(self.t, t, side="right") - 1, 0, self.steps - 1)
+        return _dense(self.states[i], self.q[i], self.t[i + 1] - self.t[i], (t - self.t[i]))
+
+    def trajectory(self, t) -> Trajectory:
+        """Path interpolated at times `t`, with its apogee and range."""
+        t = np.asarray(t, dtype=float)
+        x, y, vx, vy = self.sample(t).T
+        traj = Trajectory.from_columns(t=t, x=x, y=y, vx=vx, vy=vy)
+        traj.mark("apogee", x=self.apogee[0], y=self.apogee[1])
+        traj.mark("range", t=self.flight_time, x=self.range, y=0.0)
+        return traj
+
+
+def _dense(y0, q, step, elapsed):
+    s = np.asarray(elapsed / step)
+    powers = np.cumprod(np.repeat(s[..., None], 4, axis=-1), axis=-1)
+    return y0 + step[..., None] * np.einsum("...ij,...j->...i", q, powers)
+
+
+def _drag_rhs(s: np.ndarray, g: float, k: float) -> np.ndarray:
+    v = sqrt(s[VX]**2 + s[VY]**2)
+    return np.array([s[VX], s[VY], -k * v * s[VX], -g - k * v * s[VY]])
+
+
+def _find_root(f, lo: float = 0.0, hi: float = 1.0, tol: float = 1e-12) -> float:
+    # bracketed root of f on [lo, hi] with f(lo) > 0 >= f(hi), by bisection
+    while hi - lo > tol:
+        mid = (lo + hi) / 2
+        if f(mid) > 0:
+            lo = mid
+        else:
+            hi = mid
+    return hi
+
+
+def integrate_rk45(*, theta: float, u: float, h: float, g: float, k: float,
+                   tol: float = 1e-6, max_steps: int = 100_000) -> DragSolution:
+    """Integrate a single launch with the adaptive Dormand-Prince RK45 method.
+
+    The step size is chosen so that the local error estimate of each step stays
+    below `tol` (used as both relative and absolute tolerance). Impact with the
+    ground and the apogee are located exactly by root-finding on the dense
+    output, so no step ever overshoots below y = 0. A launch from the ground
+    (h = 0) is only checked for impact after its first step.
+    """
+    rad = np.radians(theta)
+    state = np.array([0.0, h, u * np.cos(rad), u * np.sin(rad)])
+
+    if g <= 0:
+        raise ValueError("gravity must be positive for the projectile to land")
+    if h < 0:
+        raise ValueError("launch height must not be negative")
+    if h == 0 and state[VY] <= 0:
+        raise ValueError("a launch from the ground must be aimed upward")
+
+    t_nodes = [0.0]
+    states = [state]
+    qs = []
+    apogee = (0.0, h)
+
+    # initial guess from the drag-free flight time
+    uy = state[VY]
+    step = 0.01 * (uy + sqrt(uy**2 + 2 * g * h)) / g
+
+    t = 0.0
+    f = _drag_rhs(state, g, k)
+    while True:
+        budget.check(t)
+        if len(qs) >= max_steps:
+            raise RuntimeError(f"RK45 did not reach the ground within {max_steps} steps")
+
+        K = np.empty((7, 4))
+        K[0] = f
+        for i in range(1, 6):
+            K[i] = _drag_rhs(state + step * (_DP_A[i] @ K[:i]), g, k)
+
+        new_state = state + step * (_DP_B @ K[:6])
+        K[6] = f_new = _drag_rhs(new_state, g, k)
+
+        scale = tol + tol * np.maximum(np.abs(state), np.abs(new_state))
+        error = np.sqrt(np.mean((step * (_DP_E @ K) / scale)**2))
+
+        if error > 1:
+            step *= max(0.2, 0.9 * error**-0.2)
+            continue
+
+        q = K.T @ _DP_P
+        interp = lambda s, col: (state + step * q @ np.cumprod([s] * 4))[col]
+
+        if state[VY] > 0 >= new_state[VY]:
+            s = _find_root(lambda s: interp(s, VY))
+            apogee = tuple(interp(s, slice(None, VX)))
+
+        # a ground launch starts on y = 0, so only leaves it after the first step
+        if new_state[Y] <= 0 and (qs or h > 0):
+            s = _find_root(lambda s: interp(s, Y))
+            t_nodes.append(t + s * step)
+            states.append(state + step * q @ np.cumprod([s] * 4))
+            states[-1][Y] = 0.0
+            qs.append(q * np.array([s, s**2, s**3, s**4]) / s)
+            break
+
+        t += step
+        t_nodes.append(t)
+        states.append(new_state)
+        qs.append(q)
+
+        state, f = new_state, f_new
+        step *= min(10.0, 0.9 * max(error, 1e-10)**-0.2)
+
+    return DragSolution(t=np.array(t_nodes), states=np.array(states), q=np.array(qs), apogee=apogee)
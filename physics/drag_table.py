@@ -0,0 +1,272 @@
+"""Precomputed drag trajectories over dimensionless launch parameters.
+
+In units of u²/g (lengths), u/g (times) and u (speeds), a launch with v²
+drag only depends on the angle, the height eta = gh/u² and the drag number
+kappa = ku²/g. `build` integrates a grid over those three parameters once,
+offline, and `lookup` interpolates it with Catmull-Rom splines along each axis
+for any launch inside the grid, with the relative error of the interpolation
+measured at the centre of its cell.
+
+The table is a float32 array, meant to be saved and memory-mapped with the
+`tables` module, so that only the 64 nodes around each lookup are read.
+"""
+
+from typing import NamedTuple
+
+import numpy as np
+
+from physics import budget
+from physics.trajectory import Trajectory
+
+
+class Axis(NamedTuple):
+    """Grid axis with nodes at top * (i / (n - 1))**power, denser near 0 for powers above 1."""
+
+    top: float
+    power: int
+    n: int
+
+    @property
+    def nodes(self) -> np.ndarray:
+        return self.top * np.linspace(0, 1, self.n)**self.power
+
+    def index(self, value: float) -> float:
+        """Fractional index of `value`, in which the tabulated values are smooth."""
+        return (value / self.top)**(1 / self.power) * (self.n - 1)
+
+
+THETA = Axis(90.0, 1, 37)  # deg
+ETA = Axis(2.0, 2, 13)
+KAPPA = Axis(40.0, 2, 17)
+
+# states stored per trajectory, at equal fractions of its flight time
+SAMPLES = 24
+
+# features of each node: flight time, range, apogee, error of its cell, then the (x, y, vx, vy) samples
+T, R, XA, YA, ERR = range(5)
+FEATURES = 5 + 4 * SAMPLES
+SHAPE = (THETA.n, ETA.n, KAPPA.n, FEATURES)
+
+# stored with the table: change whenever the grid, the features or the integration change
+VERSION = 1
+
+# fixed steps used to find the flight time, and steps between stored samples
+_LANDING_DT = 4e-3
+_SUBSTEPS = 32
+
+
+class DragLookup(NamedTuple):
+    """Interpolated launch in physical units, from `lookup`."""
+
+    flight_time: float
+    range: float
+    apogee: tuple[float, float]
+    trajectory: Trajectory
+    error: float
+
+
+def _rhs(s: np.ndarray, kappa: np.ndarray) -> np.ndarray:
+    v = np.hypot(s[:, 2], s[:, 3])
+    return np.stack([s[:, 2], s[:, 3], -kappa * v * s[:, 2], -1 - kappa * v * s[:, 3]], axis=1)
+
+
+def _rk4(s: np.ndarray, kappa: np.ndarray, dt: np.ndarray) -> np.ndarray:
+    dt = dt[:, None]
+    k1 = _rhs(s, kappa)
+    k2 = _rhs(s + dt / 2 * k1, kappa)
+    k3 = _rhs(s + dt / 2 * k2, kappa)
+    k4 = _rhs(s + dt * k3, kappa)
+    return s + dt / 6 * (k1 + 2 * k2 + 2 * k3 + k4)
+
+
+def _hermite_root(y0, vy0, y1, vy1, dt, iterations: int = 40) -> np.ndarray:
+    # fraction of a step at which the cubic through (y, vy) at both of its ends crosses zero (y0 > 0 >= y1)
+    lo, hi = np.zeros_like(y0), np.ones_like(y0)
+    for _ in range(iterations):
+        s = (lo + hi) / 2
+        y = ((2 * s**3 - 3 * s**2 + 1) * y0 + (s**3 - 2 * s**2 + s) * dt * vy0 +
+             (-2 * s**3 + 3 * s**2) * y1 + (s**3 - s**2) * dt * vy1)
+        above = y > 0
+        lo = np.where(above, s, lo)
+        hi = np.where(above, hi, s)
+    return hi
+
+
+def _launch(theta, eta) -> np.ndarray:
+    rad = np.radians(theta)
+    return np.stack([np.zeros_like(rad), eta, np.cos(rad), np.sin(rad)], axis=1)
+
+
+def _flight_times(theta, eta, kappa) -> np.ndarray:
+    s = _launch(theta, eta)
+    flight_t = np.zeros(len(s))
+    active = np.flatnonzero((s[:, 1] > 0) | (s[:, 3] > 0))
+    s = s[active]
+    dt = np.full(len(s), _LANDING_DT)
+
+    i = 0
+    while active.size:
+        if not i % 64:
+            budget.check()
+        stepped = _rk4(s, kappa[active], dt)
+        i += 1
+
+        landed = stepped[:, 1] <= 0
+        if landed.any():
+            frac = _hermite_root(s[landed, 1], s[landed, 3], stepped[landed, 1], stepped[landed, 3],
+                                 _LANDING_DT)
+            flight_t[active[landed]] = (i - 1 + frac) * _LANDING_DT
+            active, stepped, dt = active[~landed], stepped[~landed], dt[~landed]
+        s = stepped
+    return flight_t
+
+
+def _solve(theta, eta, kappa) -> np.ndarray:
+    # (n, FEATURES) rows for launches given as flat arrays
+    flight_t = _flight_times(theta, eta, kappa)
+
+    # integrate again with a step dividing the flight time exactly, so that every sample lands on a step
+    s = _launch(theta, eta)
+    dt = flight_t / ((SAMPLES - 1) * _SUBSTEPS)
+    samples = np.empty((len(s), SAMPLES, 4))
+    samples[:, 0] = s
+    apogee = s[:, :2].copy()
+
+    for i in range(1, (SAMPLES - 1) * _SUBSTEPS + 1):
+        if not i % 64:
+            budget.check()
+        stepped = _rk4(s, kappa, dt)
+
+        # the apogee is where vy changes sign: with vy linear within the step, y is quadratic
+        top = (s[:, 3] > 0) & (stepped[:, 3] <= 0)
+        if top.any():
+            tau = dt[top] * s[top, 3] / (s[top, 3] - stepped[top, 3])
+            vx = s[top, 2] + (stepped[top, 2] - s[top, 2]) * tau / dt[top]
+            apogee[top, 0] = s[top, 0] + (s[top, 2] + vx) / 2 * tau
+            apogee[top, 1] = s[top, 1] + s[top, 3] / 2 * tau
+
+        s = stepped
+        if not i % _SUBSTEPS:
+            samples[:, i // _SUBSTEPS] = s
+    samples[:, -1, 1] = 0.0  # lands exactly on the ground
+
+    rows = np.empty((len(s), FEATURES))
+    rows[:, T] = flight_t
+    rows[:, R] = samples[:, -1, 0]
+    rows[:, XA:YA + 1] = apogee
+    rows[:, ERR] = np.inf
+    rows[:, ERR + 1:] = samples.reshape(len(s), -1)
+    return rows
+
+
+def _relative_error(approx: np.ndarray, exact: np.ndarray) -> np.ndarray:
+    cols = [T, R, YA]
+    return np.max(np.abs(approx[:, cols] - exact[:, cols]) / np.maximum(np.abs(exact[:, cols]), 1e-9),
+                  axis=1)
+
+
+def _stencil(x: float, axis: Axis) -> tuple[int, np.ndarray]:
+    # Catmull-Rom weights of nodes start..start+3 at fractional index x, with a linearly extrapolated
+    # node past each end of the axis; on an axis in index squared, values are even in the index, so the
+    # node before 0 mirrors node 1
+    n = axis.n
+    i = min(int(x), n - 2)
+    t = x - i
+    w = np.array([(-t**3 + 2 * t**2 - t) / 2, (3 * t**3 - 5 * t**2 + 2) / 2,
+                  (-3 * t**3 + 4 * t**2 + t) / 2, (t**3 - t**2) / 2])
+    if i == 0 and axis.power == 2:
+        return 0, np.array([w[1], w[2] + w[0], w[3], 0.0])
+    if i == 0:
+        return 0, np.array([w[1] + 2 * w[0], w[2] - w[0], w[3], 0.0])
+    if i == n - 2:
+        return n - 4, np.array([0.0, w[0], w[1] - w[3], w[2] + 2 * w[3]])
+    return i - 1, w
+
+
+def _centre_weights(axis: Axis) -> np.ndarray:
+    # (n - 1, n) weights of the nodes at the centre of each cell along an axis
+    weights = np.zeros((axis.n - 1, axis.n))
+    for i in range(axis.n - 1):
+        start, w = _stencil(i + 0.5, axis)
+        weights[i, start:start + 4] = w
+    return weights
+
+
+def build() -> np.ndarray:
+    """Integrate the whole grid, as a float32 array of shape `SHAPE`.
+
+    The error of each cell is measured at its centre, against the launch
+    integrated there, and stored with the node at its lowest corner.
+    """
+    axes = (THETA, ETA, KAPPA)
+    nodes = np.stack(np.meshgrid(*(axis.nodes for axis in axes), indexing="ij"), axis=-1)
+    mids = [axis.top * ((np.arange(axis.n - 1) + 0.5) / (axis.n - 1))**axis.power for axis in axes]
+    centres = np.stack(np.meshgrid(*mids, indexing="ij"), axis=-1)
+
+    shape, cells = nodes.shape[:3], centres.shape[:3]
+    params = np.concatenate([nodes.reshape(-1, 3), centres.reshape(-1, 3)])
+    rows = _solve(*params.T)
+
+    table = rows[:np.prod(shape)].reshape(*shape, FEATURES)
+    exact = rows[np.prod(shape):]
+
+    finite = table.copy()
+    finite[..., ERR] = 0
+    interpolated = np.einsum("ai,bj,ck,ijkf->abcf",
+                             *(_centre_weights(axis) for axis in axes),
+                             finite,
+                             optimize=True)
+    table[:-1, :-1, :-1, ERR] = _relative_error(interpolated.reshape(-1, FEATURES),
+                                                 exact).reshape(cells)
+    return table.astype(np.float32)
+
+
+def _resample(states: np.ndarray, kappa: float, flight_t: float, n: int) -> np.ndarray:
+    # (n, 4) states at equal fractions of the flight, by cubic Hermite interpolation between the stored
+    # samples, with the derivative of every state given by the equations of motion
+    step = flight_t / (SAMPLES - 1)
+    slopes = step * _rhs(states, kappa)
+    t = np.linspace(0, SAMPLES - 1, n)
+    i = np.minimum(t.astype(int), SAMPLES - 2)
+    s = (t - i)[:, None]
+    return ((2 * s**3 - 3 * s**2 + 1) * states[i] + (s**3 - 2 * s**2 + s) * slopes[i] +
+            (-2 * s**3 + 3 * s**2) * states[i + 1] + (s**3 - s**2) * slopes[i + 1])
+
+
+def lookup(table: np.ndarray, *, theta: float, u: float, h: float, g: float, k: float,
+           samples: int = SAMPLES) -> DragLookup | None:
+    """Interpolate the launch from the table, or None if it is outside the grid.
+
+    The path has `samples` states at equal fractions of the flight time: the
+    stored ones, or states interpolated between them.
+    """
+    if not (u > 0 and g > 0):
+        return None
+
+    length, time = u**2 / g, u / g
+    eta, kappa = h / length, k * length
+    if not (0 <= theta <= THETA.top and 0 <= eta <= ETA.top and 0 <= kappa <= KAPPA.top):
+        return None
+
+    x = [axis.index(value) for axis, value in ((THETA, theta), (ETA, eta), (KAPPA, kappa))]
+    (i, wa), (j, wb), (l, wc) = (_stencil(xi, axis) for xi, axis in zip(x, (THETA, ETA, KAPPA)))
+
+    nodes = np.array(table[i:i + 4, j:j + 4, l:l + 4], dtype=float)
+    error = table[min(int(x[0]), THETA.n - 2), min(int(x[1]), ETA.n - 2), min(int(x[2]), KAPPA.n - 2), ERR]
+    nodes[..., ERR] = 0  # errors belong to cells, not interpolated
+    row = np.einsum("i,j,k,ijkf->f", wa, wb, wc, nodes)
+
+    states = row[ERR + 1:].reshape(SAMPLES, 4)
+    if samples != SAMPLES:
+        states = _resample(states, kappa, row[T], samples)
+    x, y, vx, vy = states.T * np.array([length, length, u, u])[:, None]
+    flight_t, range_, apogee = row[T] * time, row[R] * length, (row[XA] * length, row[YA] * length)
+
+    traj = Trajectory.from_columns(t=np.linspace(0, flight_t, samples), x=x, y=y, vx=vx, vy=vy)
+    traj.mark("apogee", x=apogee[0], y=apogee[1])
+    traj.mark("range", t=flight_t, x=range_, y=0.0)
+    return DragLookup(flight_time=flight_t,
+                      range=range_,
+                      apogee=apogee,
+                      trajectory=traj,
+                      error=float(error))
@@ -0,0 +1,162 @@
+"""Families of drag launches integrated across worker processes.
+
+`integrate_family` splits N launches (e.g. many angles or drag factors)
+between processes, each running `drag.integrate_verlet` on its share. The
+parameters and results are not pickled but passed through one block of
+shared memory: every worker maps the block, reads the parameters of its
+launches and writes their results back at the same positions, so the results
+come out in launch order however the work was split; recorded paths come
+back in a block per share, sized once its launches have landed. Launches are
+dealt out in turn (launch i goes to share i mod n), so each share gets a
+similar mix of short and long flights.
+
+Each share is still integrated as one batch, whose cost per step is about
+constant below a few thousand launches, so splitting only pays off for large
+families.
+"""
+
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from physics import drag
+
+# rows of the shared block: parameters, then steps, apogee (x, y) and final state (x, y, vx, vy)
+_PARAMS = ("theta", "u", "h", "g", "k")
+_ROWS = len(_PARAMS) + 7
+
+# below this many launches per worker, a single batch in the calling process is faster
+MIN_SHARE = 2048
+
+_pools: dict[int, ProcessPoolExecutor] = {}
+_pools_lock = threading.Lock()
+
+
+def _pool(workers: int) -> ProcessPoolExecutor:
+    # started once per size and reused; spawned rather than forked, as the caller may be threaded
+    with _pools_lock:
+        if workers not in _pools:
+            _pools[workers] = ProcessPoolExecutor(max_workers=workers,
+                                                  mp_context=multiprocessing.get_context("spawn"))
+        return _pools[workers]
+
+
+def _integrate_share(block: str, n: int, share: int, shares: int, dt: float, max_steps: float,
+                     record: bool) -> tuple[str, tuple[int, ...]] | None:
+    # with record=True, the history is returned in a block of its own (name, shape), sized once
+    # the share has landed; the caller unlinks it
+    shm = shared_memory.SharedMemory(name=block)
+    data = None
+    try:
+        data = np.ndarray((_ROWS, n), dtype=np.float64, buffer=shm.buf)
+        own = slice(share, n, shares)
+        # copied, so a failed integration leaves no view of the block in its traceback
+        theta, u, h, g, k = data[:len(_PARAMS), own].copy()
+        batch = drag.integrate_verlet(theta=theta,
+                                      u=u,
+                                      h=h,
+                                      g=g,
+                                      k=k,
+                                      dt=dt,
+                                      record=record,
+                                      max_steps=max_steps)
+
+        data[len(_PARAMS):, own] = np.vstack([batch.steps, batch.apogee.T, batch.final.T])
+    finally:
+        data = None  # views of a block must go before it is closed, even on an error
+        shm.close()
+
+    if not record:
+        return None
+    shm_history = shared_memory.SharedMemory(create=True, size=max(batch.states.nbytes, 1))
+    try:
+        np.ndarray(batch.states.shape, dtype=np.float64, buffer=shm_history.buf)[:] = batch.states
+    except BaseException:
+        shm_history.close()
+        shm_history.unlink()
+        raise
+    shm_history.close()
+    return shm_history.name, batch.states.shape
+
+
+def _attach(future) -> tuple[shared_memory.SharedMemory, tuple[int, ...]] | None:
+    # history block returned by a share, if it finished and recorded one
+    if future.exception() is not None or future.result() is None:
+        return None
+    name, shape = future.result()
+    return shared_memory.SharedMemory(name=name), shape
+
+
+def integrate_family(*,
+                     theta,
+                     u,
+                     h,
+                     g,
+                     k,
+                     dt: float,
+                     workers: int,
+                     record: bool = False,
+                     max_steps: float = float("inf")) -> drag.DragBatch:
+    """`drag.integrate_verlet` for a family of launches, split between `workers` processes.
+
+    Takes and returns the same arrays as `drag.integrate_verlet`, in the same
+    order, and stops launches at `max_steps` in the same way.
+    """
+    theta, u, h, g, k = (np.ravel(arr) for arr in np.broadcast_arrays(
+        *(np.asarray(v, dtype=float) for v in (theta, u, h, g, k))))
+    n = theta.size
+    shares = min(workers, n // MIN_SHARE)
+    if shares <= 1:
+        return drag.integrate_verlet(theta=theta,
+                                     u=u,
+                                     h=h,
+                                     g=g,
+                                     k=k,
+                                     dt=dt,
+                                     record=record,
+                                     max_steps=max_steps)
+
+    shm = shared_memory.SharedMemory(create=True, size=_ROWS * n * 8)
+    histories = []
+    data = None
+    try:
+        data = np.ndarray((_ROWS, n), dtype=np.float64, buffer=shm.buf)
+        data[:len(_PARAMS)] = theta, u, h, g, k
+
+        pool = _pool(workers)
+        futures = [
+            pool.submit(_integrate_share, shm.name, n, share, shares, dt, max_steps, record)
+            for share in range(shares)
+        ]
+        # every share is done with the blocks before they are released, even if one failed
+        wait(futures)
+        histories = [_attach(future) for future in futures]
+        try:
+            for future in futures:
+                future.result()
+        except BrokenProcessPool:
+            with _pools_lock:
+                _pools.pop(workers, None)  # a worker died, so start a new pool next time
+            raise
+
+        steps = data[len(_PARAMS)].astype(np.int64)
+        apogee = data[len(_PARAMS) + 1:len(_PARAMS) + 3].T.copy()
+        final = data[len(_PARAMS) + 3:].T.copy()
+        states = None
+        if record:
+            states = np.full((steps.max(initial=0), n, 4), np.nan)
+            for share, (history, shape) in enumerate(histories):
+                states[:shape[0], share::shares] = np.ndarray(shape,
+                                                              dtype=np.float64,
+                                                              buffer=history.buf)
+    finally:
+        data = None  # views of a block must go before it is closed
+        for block in (shm, *(history for history, _ in filter(None, histories))):
+            block.close()
+            block.unlink()
+
+    return drag.DragBatch(dt=dt, steps=steps, apogee=apogee, final=final, states=states)
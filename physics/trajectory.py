@@ -0,0 +1,135 @@
+"""Sampled trajectories in one columnar buffer, shared by every model.
+
+A `Trajectory` stores its columns (e.g. t, x, y, vx, vy) as the rows of a
+single preallocated (columns, capacity) array, grown by doubling, so each
+column is a contiguous array that can be handed to Plotly or written out
+without copying. Step-by-step integrators `append` rows, which are staged in
+a compact `array.array` and copied into the buffer in blocks; vectorized
+models `extend` whole columns at once. Points of interest along the path
+(apogee, impacts, range) are kept as `Event`s.
+"""
+
+from array import array
+
+import numpy as np
+
+# rows staged by `append` before they are copied into the buffer
+_BLOCK = 4096
+
+
+class Event:
+    """A point of interest along a trajectory, e.g. its apogee or an impact with the ground."""
+
+    __slots__ = ("kind", "t", "x", "y")
+
+    def __init__(self, kind: str, *, t: float | None = None, x: float, y: float):
+        self.kind = kind
+        self.t = t
+        self.x = x
+        self.y = y
+
+    def __repr__(self) -> str:
+        return f"Event({self.kind!r}, t={self.t}, x={self.x}, y={self.y})"
+
+
+class Trajectory:
+    """Growable columnar buffer of float64 (or float32) samples, with events.
+
+    Columns are read as attributes (`traj.x`) or with `column`, and are views
+    of the buffer, valid until the next row is added.
+    """
+
+    __slots__ = ("columns", "events", "_index", "_buffer", "_size", "_staged")
+
+    def __init__(self, columns=("t", "x", "y"), *, capacity: int = 1024, dtype=np.float64):
+        self.columns = tuple(columns)
+        self.events = []
+        self._index = {name: i for i, name in enumerate(self.columns)}
+        self._buffer = np.empty((len(self.columns), max(capacity, 1)), dtype=dtype)
+        self._size = 0
+        self._staged = array("d")
+
+    @classmethod
+    def from_columns(cls, *, dtype=np.float64, **columns) -> "Trajectory":
+        """Trajectory holding `columns` (arrays of equal length, or scalars repeated along them)."""
+        n = max(np.size(values) for values in columns.values())
+        traj = cls(columns, capacity=n, dtype=dtype)
+        traj.extend(**columns)
+        return traj
+
+    def __len__(self) -> int:
+        return self._size + len(self._staged) // len(self.columns)
+
+    def _reserve(self, rows: int) -> None:
+        if rows > self._buffer.shape[1]:
+            grown = np.empty((len(self.columns), max(rows, 2 * self._buffer.shape[1])),
+                             dtype=self._buffer.dtype)
+            grown[:, :self._size] = self._buffer[:, :self._size]
+            self._buffer = grown
+
+    def _flush(self) -> None:
+        if self._staged:
+            block = np.frombuffer(self._staged, dtype=np.float64).reshape(-1, len(self.columns))
+            self._reserve(self._size + len(block))
+            self._buffer[:, self._size:self._size + len(block)] = block.T
+            self._size += len(block)
+            self._staged = array("d")
+
+    def append(self, *row: float) -> None:
+        """Add one row, with a value for every column in order."""
+        self._staged.extend(row)
+        if len(self._staged) >= _BLOCK * len(self.columns):
+            self._flush()
+
+    def extend(self, **columns) -> None:
+        """Add rows given as arrays (or scalars) for every column."""
+        self._flush()
+        values = np.broadcast_arrays(*(np.asarray(columns[name], dtype=float) for name in self.columns))
+        n = values[0].size
+        self._reserve(self._size + n)
+        for i, column in enumerate(values):
+            self._buffer[i, self._size:self._size + n] = column.ravel()
+        self._size += n
+
+    def array(self) -> np.ndarray:
+        """(columns, rows) view of every sample."""
+        self._flush()
+        return self._buffer[:, :self._size]
+
+    def column(self, name: str) -> np.ndarray:
+        self._flush()
+        return self._buffer[self._index[name], :self._size]
+
+    def __getattr__(self, name: str) -> np.ndarray:
+        try:
+            index = object.__getattribute__(self, "_index")
+        except AttributeError:
+            raise AttributeError(name) from None
+        if name not in index:
+            raise AttributeError(f"trajectory has no column {name!r}")
+        return self.column(name)
+
+    def mark(self, kind: str, *, t: float | None = None, x: float, y: float) -> Event:
+        event = Event(kind, t=t, x=x, y=y)
+        self.events.append(event)
+        return event
+
+    def event(self, kind: str) -> Event | None:
+        """First event of a kind, if any."""
+        return next((event for event in self.events if event.kind == kind), None)
+
+    def thin(self, max_points: int, *, keep=()) -> "Trajectory":
+        """At most about `max_points` evenly spaced rows, plus the rows at indices `keep`.
+
+        Returns a copy sharing the events, always with the first and last rows,
+        or the trajectory itself when it has no more than `max_points` rows.
+        """
+        n = len(self)
+        if n <= max_points:
+            return self
+
+        rows = np.union1d(np.linspace(0, n - 1, max_points, dtype=int), np.asarray(keep, dtype=int))
+        thinned = Trajectory(self.columns, capacity=len(rows), dtype=self._buffer.dtype)
+        thinned.extend(**{name: self.column(name)[rows] for name in self.columns})
+        thinned.events = self.events
+        return thinned
@@ -0,0 +1,195 @@
+"""Evaluate the models over a file of launch parameters, from the command line.
+
+Parameters are read from a CSV file with a header row, or from an .npy file
+holding a structured array or a 2D array with its columns in the order of
+`PARAMS`; missing columns take the defaults of Task 9. Each row gets the Task 2
+flight time, range and apogee, the Task 4 angle of maximum range, the Task 6
+arc lengths and the Task 9 drag model (Verlet, with a fixed time step):
+
+    python sweep.py params.csv results.csv
+    python sweep.py params.npy results.npy --workers 8 --chunk 16384
+
+Rows are evaluated in vectorized chunks, with the drag model of each chunk
+split between worker processes (see `physics.family`), and written out in
+input order as each chunk finishes, so memory stays bounded by the chunk size
+whatever the size of the file. Results are written as CSV,
+or as a float64 .npy array with the columns of `COLUMNS`. Rows a model cannot
+evaluate (e.g. without gravity, or needing more than --max-steps drag steps)
+get NaN for its outputs.
+"""
+
+import argparse
+import itertools
+import os
+import sys
+import time
+
+import numpy as np
+
+import config
+from physics import analytic, drag, family
+from tasks import task_9
+
+PARAMS = ("theta", "u", "h", "g", "Cd", "m", "a", "P")
+OUTPUTS = ("flight_time", "range", "apogee_x", "apogee_y", "arc_length", "max_range_angle",
+           "max_range", "max_arc_length", "k", "drag_flight_time", "drag_range", "drag_apogee_x",
+           "drag_apogee_y")
+COLUMNS = PARAMS + OUTPUTS
+
+
+@np.errstate(all="ignore")
+def evaluate(params: np.ndarray, *, dt: float, max_steps: int, workers: int) -> np.ndarray:
+    """(rows, COLUMNS) results for (rows, PARAMS) launch parameters."""
+    theta, u, h, g, Cd, m, a, P = params.T
+    out = np.full((len(params), len(OUTPUTS)), np.nan)
+    columns = dict(zip(OUTPUTS, out.T))
+
+    # Task 2
+    total_t = analytic.flight_time(theta=theta, u=u, h=h, g=g)
+    ux, _ = analytic.components(theta=theta, u=u)
+    columns["flight_time"][:] = total_t
+    columns["range"][:] = ux * total_t
+    columns["apogee_x"][:], columns["apogee_y"][:] = analytic.apogee(theta=theta, u=u, h=h, g=g)
+
+    # Tasks 4 and 6
+    theta_max = analytic.max_range_angle(u=u, h=h, g=g)
+    range_max = analytic.max_range(u=u, h=h, g=g)
+    columns["arc_length"][:] = analytic.arc_length(ux * total_t, theta=theta, u=u, g=g)
+    columns["max_range_angle"][:] = theta_max
+    columns["max_range"][:] = range_max
+    columns["max_arc_length"][:] = analytic.arc_length(range_max, theta=theta_max, u=u, g=g)
+
+    # Task 9: launches still in the air after max_steps are stopped there and left as NaN (drag can
+    # make a fall from a height far longer than without it, so no drag free bound applies)
+    k = drag.drag_factor(Cd=Cd, P=P, a=a, m=m)
+    columns["k"][:] = k
+    valid = np.flatnonzero((g > 0) & (h >= 0) & (k >= 0) & np.isfinite(k))
+    if valid.size:
+        batch = family.integrate_family(theta=theta[valid],
+                                        u=u[valid],
+                                        h=h[valid],
+                                        g=g[valid],
+                                        k=k[valid],
+                                        dt=dt,
+                                        workers=workers,
+                                        max_steps=max_steps)
+        landed = ~np.isnan(batch.range)
+        columns["drag_flight_time"][valid] = np.where(landed, batch.flight_time, np.nan)
+        columns["drag_range"][valid] = batch.range
+        columns["drag_apogee_x"][valid] = batch.apogee[:, drag.X]
+        columns["drag_apogee_y"][valid] = batch.apogee[:, drag.Y]
+
+    return np.concatenate([params, out], axis=1)
+
+
+def _check_names(names, path: str) -> None:
+    unknown = set(names) - set(PARAMS)
+    if unknown:
+        raise ValueError(f"{path}: unknown columns {sorted(unknown)}, expected some of {PARAMS}")
+
+
+def _params(columns: dict) -> np.ndarray:
+    # (rows, PARAMS) array from the columns given, with defaults for the others
+    rows = len(next(iter(columns.values())))
+    params = np.empty((rows, len(PARAMS)))
+    for i, name in enumerate(PARAMS):
+        params[:, i] = columns.get(name, task_9.PLOT_DEFAULTS[name])
+    return params
+
+
+def read_chunks(path: str, chunk: int):
+    """(total rows, iterator of (rows, PARAMS) arrays) for a CSV or .npy parameter file.
+
+    .npy files are memory-mapped and CSV files read a chunk at a time, so
+    only the chunks being evaluated are in memory.
+    """
+    if path.endswith(".npy"):
+        data = np.load(path, mmap_mode="r")
+        if data.dtype.names:
+            _check_names(data.dtype.names, path)
+            columns = lambda block: {name: block[name] for name in data.dtype.names}
+        else:
+            data = data.reshape(len(data), -1)
+            if data.shape[1] > len(PARAMS):
+                raise ValueError(f"{path}: {data.shape[1]} columns, expected at most {len(PARAMS)}")
+            columns = lambda block: dict(zip(PARAMS, block.T))
+        return len(data), (_params(columns(data[i:i + chunk])) for i in range(0, len(data), chunk))
+
+    with open(path) as file:
+        names = [name.strip() for name in file.readline().split(",")]
+        total = sum(1 for line in file if line.strip())
+    _check_names(names, path)
+
+    def chunks():
+        with open(path) as file:
+            file.readline()
+            while lines := list(itertools.islice(file, chunk)):
+                yield _params(dict(zip(names, np.loadtxt(lines, delimiter=",", ndmin=2).T)))
+
+    return total, chunks()
+
+
+class _Writer:
+    """Results written in order to a CSV or .npy file."""
+
+    def __init__(self, path: str, *, rows: int):
+        self.path = path
+        self.done = 0
+        if path.endswith(".npy"):
+            self.array = np.lib.format.open_memmap(path, mode="w+", shape=(rows, len(COLUMNS)))
+            self.file = None
+        else:
+            self.array = None
+            self.file = open(path, "w")
+            self.file.write(",".join(COLUMNS) + "\n")
+
+    def write(self, results: np.ndarray) -> None:
+        if self.array is not None:
+            self.array[self.done:self.done + len(results)] = results
+        else:
+            # shortest repr that reads back as the same float
+            line = ",".join(["%r"] * len(COLUMNS)) + "\n"
+            self.file.write("".join([line % tuple(row) for row in results.tolist()]))
+        self.done += len(results)
+
+    def close(self) -> None:
+        if self.array is not None:
+            self.array.flush()
+        else:
+            self.file.close()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("input", help="CSV (with a header) or .npy file of launch parameters")
+    parser.add_argument("output", help="CSV or .npy file to write the results to")
+    parser.add_argument("--chunk", type=int, default=65536, help="rows evaluated at once")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="worker processes")
+    parser.add_argument("--dt",
+                        type=float,
+                        default=task_9.PLOT_DEFAULTS["dt"],
+                        help="time step of the drag model (s)")
+    parser.add_argument("--max-steps",
+                        type=int,
+                        default=config.MAX_STEPS,
+                        help="largest number of drag steps for a row")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    total, chunks = read_chunks(args.input, args.chunk)
+    writer = _Writer(args.output, rows=total)
+
+    for params in chunks:
+        writer.write(evaluate(params, dt=args.dt, max_steps=args.max_steps, workers=args.workers))
+        print(f"\r{writer.done:,} / {total:,} rows", end="", file=sys.stderr)
+    writer.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"\n{writer.done:,} rows in {elapsed:.1f} s ({writer.done / elapsed:,.0f} rows/s), "
+          f"written to {args.output}",
+          file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,162 @@
+"""Read-only numeric tables shared by every process on the host.
+
+A table file is mapped with mmap rather than read, so all the server
+processes (and replicas on the same machine) share one copy of it in the OS
+page cache. Files are written by `save` (or `write_rows`) as a small header
+followed by the raw little-endian array:
+
+    b"BPHOTBL\\0", then the length of the JSON header as a little-endian uint32,
+    then the JSON header (format, kind, version, dtype, shape, sha256), padded
+    with spaces so that the data starts at a multiple of 64 bytes.
+
+A `Table` is only opened on first access, checked against the kind and
+version its user expects and against its checksum, and then kept for the
+life of the process. Plain `.npy` files are also accepted, checked by dtype
+and shape only since they have no version or checksum.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import struct
+import threading
+
+import numpy as np
+
+MAGIC = b"BPHOTBL\0"
+FORMAT = 1
+_ALIGN = 64
+
+
+class TableError(ValueError):
+    """A table file is malformed, or not the table that was expected."""
+
+
+def _checksum(data: np.ndarray) -> str:
+    return hashlib.sha256(memoryview(np.ascontiguousarray(data)).cast("B")).hexdigest()
+
+
+def _header(*, kind: str, version: int, dtype: np.dtype, shape: tuple, sha256: str, **info) -> bytes:
+    header = json.dumps(
+        dict(format=FORMAT,
+             kind=kind,
+             version=version,
+             dtype=dtype.str,
+             shape=shape,
+             sha256=sha256,
+             **info)).encode()
+
+    prefix = len(MAGIC) + 4
+    header += b" " * (-(prefix + len(header)) % _ALIGN)
+    return MAGIC + struct.pack("<I", len(header)) + header
+
+
+def save(path: str, array: np.ndarray, *, kind: str, version: int) -> None:
+    """Write `array` as a table, replacing any previous file atomically."""
+    array = np.ascontiguousarray(array, dtype=array.dtype.newbyteorder("<"))
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    temp = f"{path}.{os.getpid()}.tmp"
+    with open(temp, "wb") as file:
+        file.write(
+            _header(kind=kind,
+                    version=version,
+                    dtype=array.dtype,
+                    shape=array.shape,
+                    sha256=_checksum(array)))
+        file.write(memoryview(array).cast("B"))
+    os.replace(temp, path)  # processes that already mapped the old file keep reading it
+
+
+def write_rows(file, rows: list[np.ndarray], *, kind: str, version: int, **info) -> None:
+    """Write equal length 1D arrays as the rows of a little-endian float64 table, one at a time.
+
+    Unlike `save`, the rows are never copied into one array. Any other
+    (JSON serializable) `info` is stored in the header.
+    """
+    dtype = np.dtype("<f8")
+    rows = [np.ascontiguousarray(row, dtype=dtype) for row in rows]
+    checksum = hashlib.sha256()
+    for row in rows:
+        checksum.update(memoryview(row).cast("B"))
+
+    shape = (len(rows), len(rows[0]) if rows else 0)
+    file.write(_header(kind=kind, version=version, dtype=dtype, shape=shape, sha256=checksum.hexdigest(),
+                       **info))
+    for row in rows:
+        file.write(memoryview(row).cast("B"))
+
+
+def _open(path: str, *, kind: str, version: int, shape: tuple | None) -> np.ndarray:
+    with open(path, "rb") as file:
+        magic = file.read(len(MAGIC))
+        if magic.startswith(b"\x93NUMPY"):
+            array = np.load(path, mmap_mode="r")
+            if shape is not None and array.shape != tuple(shape):
+                raise TableError(f"shape {array.shape}, expected {tuple(shape)}")
+            return array
+
+        if magic != MAGIC:
+            raise TableError("not a table file")
+        (length, ) = struct.unpack("<I", file.read(4))
+        header = json.loads(file.read(length))
+
+    if header.get("format") != FORMAT:
+        raise TableError(f"format {header.get('format')}, expected {FORMAT}")
+    if header["kind"] != kind or header["version"] != version:
+        raise TableError(f"{header['kind']} table version {header['version']}, "
+                         f"expected {kind} version {version}")
+    if shape is not None and tuple(header["shape"]) != tuple(shape):
+        raise TableError(f"shape {tuple(header['shape'])}, expected {tuple(shape)}")
+
+    array = np.memmap(path,
+                      dtype=np.dtype(header["dtype"]),
+                      mode="r",
+                      offset=len(MAGIC) + 4 + length,
+                      shape=tuple(header["shape"]))
+    if _checksum(array) != header["sha256"]:
+        raise TableError("checksum mismatch")
+    return array
+
+
+class Table:
+    """A table file, memory-mapped and validated on first access.
+
+    `get` returns the read-only array, or None if the file is missing or
+    invalid (which is logged once), so that callers can fall back to
+    computing without it.
+    """
+
+    def __init__(self, path: str, *, kind: str, version: int, shape: tuple | None = None):
+        self.path = path
+        self.kind = kind
+        self.version = version
+        self.shape = shape
+
+        self._array = None
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def get(self) -> np.ndarray | None:
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    self._array = self._load()
+                    self._loaded = True
+        return self._array
+
+    def _load(self) -> np.ndarray | None:
+        try:
+            return _open(self.path, kind=self.kind, version=self.version, shape=self.shape)
+        except FileNotFoundError:
+            logging.getLogger(__name__).info("%s table not found at %s", self.kind, self.path)
+        except (OSError, ValueError, KeyError, struct.error) as e:
+            logging.getLogger(__name__).warning("%s table at %s not used: %s", self.kind, self.path, e)
+        return None
+
+    def reload(self) -> None:
+        """Open the file again on next access, e.g. after it was rebuilt."""
+        with self._lock:
+            self._array = None
+            self._loaded = False
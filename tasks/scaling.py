@@ -0,0 +1,52 @@
+"""Drag-free results for any launch speed and gravity, from those for u = g = 1.
+
+Without drag every length in a trajectory scales with u²/g and every time with
+u/g, so the result for (theta, u, h, g) is the one for (theta, 1, gh/u², 1)
+with its lengths and times multiplied by those units. `cache.cache_scaled`
+uses a page's `Scaling` to serve every input with the same theta and gh/u²
+from one cached result.
+"""
+
+from math import isfinite
+from typing import Callable, NamedTuple
+
+import numpy as np
+import plotly.graph_objects as go
+
+
+class Scaling(NamedTuple):
+    """How to normalize the inputs of a page function and rescale its result.
+
+    `rescale(result, length=, time=)` returns the result for inputs whose units
+    of length and time are `length` and `time` times those of the normalized
+    inputs. `times` names any other inputs measured in seconds.
+    """
+
+    rescale: Callable
+    times: tuple[str, ...] = ()
+
+    def normalize(self, kwargs: dict) -> tuple[dict, dict | None]:
+        """Inputs with u = g = 1, and the units to rescale their result by (None if they cannot be scaled)."""
+        u, g = kwargs["u"], kwargs["g"]
+        if not (u > 0 and g > 0 and isfinite(u**2 / g)):
+            return kwargs, None
+
+        length, time = u**2 / g, u / g
+        normalized = kwargs | dict(u=1.0, g=1.0, h=kwargs["h"] / length)
+        normalized |= {name: kwargs[name] / time for name in self.times}
+        return normalized, dict(length=length, time=time)
+
+
+def scale_figure(fig: go.Figure, *, x: float = 1.0, y: float = 1.0) -> go.Figure:
+    """Copy of a figure with the x and y data of every trace multiplied by `x` and `y`.
+
+    Point labels must be written as a `texttemplate` of the data to follow it.
+    """
+    spec = fig.to_dict()
+    for trace in spec["data"]:
+        for axis, factor in (("x", x), ("y", y)):
+            if axis in trace:
+                trace[axis] = np.asarray(trace[axis], dtype=float) * factor
+
+    # the figure was validated when it was built, scaling its data cannot make it invalid
+    return go.Figure(spec, _validate=False)
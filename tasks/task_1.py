@@ -0,0 +1,51 @@
+import plotly.graph_objects as go
+import numpy as np
+
+import config
+from physics import analytic
+from tasks import scaling
+
+PLOT_DEFAULTS = {"theta": 45.0, "g": 9.81, "u": 20.0, "h": 2.0, "dt": 0.10}
+
+
+def _interval_note(dt: float) -> str:
+    return (f"The time interval was increased to {dt:.3g} s to plot at most "
+            f"{config.MAX_PLOT_POINTS:,} points.")
+
+
+@np.errstate(divide="raise", invalid="raise")
+def generate_task_1(*, theta: float, g: float, u: float, h: float, dt: float):
+    total_t = analytic.flight_time(theta=theta, u=u, h=h, g=g)
+
+    # plot at most MAX_PLOT_POINTS points, however small (or zero) the time interval is
+    notes = []
+    if dt <= 0 or total_t / dt > config.MAX_PLOT_POINTS:
+        dt = total_t / config.MAX_PLOT_POINTS
+        notes.append(_interval_note(dt))
+
+    t = np.arange(0, total_t, dt) if dt > 0 else np.zeros(1)
+    path = analytic.trajectory(t, theta=theta, u=u, h=h, g=g)
+
+    fig = go.Figure(
+        data=[go.Scatter(x=path.x, y=path.y, mode="markers")],
+        layout=config.GO_BASE_LAYOUT,
+    )
+
+    fig.update_layout(
+        title_text="Projectile Motion",
+        xaxis_title="x (m)",
+        yaxis_title="y (m)",
+    )
+
+    return fig, total_t, notes
+
+
+def _rescale(result, *, length: float, time: float):
+    fig, total_t, notes = result
+    total_t *= time
+    # the only note is about the time interval, which is then a fixed fraction of the flight time
+    notes = [_interval_note(total_t / config.MAX_PLOT_POINTS) for _ in notes]
+    return scaling.scale_figure(fig, x=length, y=length), total_t, notes
+
+
+SCALING = scaling.Scaling(rescale=_rescale, times=("dt", ))
@@ -0,0 +1,61 @@
+import plotly.graph_objects as go
+import numpy as np
+
+import config
+from physics import analytic
+from tasks import scaling
+
+PLOT_DEFAULTS = {"theta": 45.0, "g": 9.81, "u": 20.0, "h": 2.0}
+
+
+@np.errstate(divide="raise", invalid="raise")
+def generate_task_2(*, theta: float, g: float, u: float, h: float):
+    total_t = analytic.flight_time(theta=theta, u=u, h=h, g=g)
+    path = analytic.trajectory(np.linspace(0, total_t, config.GRAPH_SAMPLES), theta=theta, u=u, h=h, g=g)
+
+    apogee = path.event("apogee")
+    xa, ya = apogee.x, apogee.y
+    total_x = path.event("range").x
+
+    fig = go.Figure(
+        data=[
+            go.Scatter(name="Trajectory", x=path.x, y=path.y, mode="lines", line_shape='spline'),
+            go.Scatter(name="Apogee",
+                       x=[xa],
+                       y=[ya],
+                       texttemplate="(%{x:.2f}, %{y:.2f})",
+                       textposition="bottom center",
+                       textfont=dict(size=14),
+                       marker_symbol="0",
+                       marker=dict(size=8),
+                       mode='markers+text'),
+            go.Scatter(name="Range",
+                       x=[total_x],
+                       y=[0],
+                       texttemplate="(%{x:.2f}, 0)",
+                       textposition="top center",
+                       textfont=dict(size=14),
+                       marker_symbol="x",
+                       marker=dict(size=11),
+                       mode='markers+text',
+                       showlegend=False)
+        ],
+        layout=config.GO_BASE_LAYOUT,
+    )
+
+    fig.update_layout(
+        title_text="Analytical Model",
+        xaxis_title="x (m)",
+        yaxis_title="y (m)",
+    )
+
+    return fig, (xa, ya), total_x, total_t
+
+
+def _rescale(result, *, length: float, time: float):
+    fig, (xa, ya), total_x, total_t = result
+    return (scaling.scale_figure(fig, x=length, y=length), (xa * length, ya * length),
+            total_x * length, total_t * time)
+
+
+SCALING = scaling.Scaling(rescale=_rescale)
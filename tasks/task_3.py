@@ -0,0 +1,69 @@
+import plotly.graph_objects as go
+import numpy as np
+
+import config
+from physics import analytic
+
+PLOT_DEFAULTS = {"target_x": 20.0, "target_y": 10.0, "g": 9.81, "u": 20.0, "h": 0.0}
+
+
+@np.errstate(divide="raise", invalid="raise")
+def generate_task_3(*, target_x: float, target_y: float, g: float, u: float, h: float):
+    x = np.linspace(0, target_x, config.GRAPH_SAMPLES)
+
+    min_u, min_tan_theta = analytic.min_speed_to_target(X=target_x, Y=target_y, h=h, g=g)
+
+    # min vel trajectory
+    min_y_traj = analytic.height_at_tan(x, tan_theta=min_tan_theta, u=min_u, h=h, g=g)
+
+    fig = go.Figure(
+        data=[
+            go.Scatter(name="Min. vel.", x=x, y=min_y_traj, mode="lines", line_shape='spline'),
+            go.Scatter(name="Target",
+                       x=[target_x],
+                       y=[target_y],
+                       text=[f"({target_x}, {target_y})"],
+                       textposition="bottom center",
+                       textfont=dict(size=15),
+                       marker_symbol="x",
+                       marker=dict(size=11),
+                       mode='markers+text')
+        ],
+        layout=config.GO_BASE_LAYOUT,
+    )
+
+    fig.update_layout(
+        title_text="Hitting a Target",
+        xaxis_title="x (m)",
+        yaxis_title="y (m)",
+    )
+
+    if u > min_u:
+        # find high and low ball trajectories
+        low_tan_theta, high_tan_theta = analytic.target_tan_angles(X=target_x,
+                                                                   Y=target_y,
+                                                                   u=u,
+                                                                   h=h,
+                                                                   g=g)
+        low_y_traj = analytic.height_at_tan(x, tan_theta=low_tan_theta, u=u, h=h, g=g)
+        high_y_traj = analytic.height_at_tan(x, tan_theta=high_tan_theta, u=u, h=h, g=g)
+
+        fig.add_traces(data=[
+            go.Scatter(name="Low ball",
+                       x=x,
+                       y=low_y_traj,
+                       mode="lines",
+                       line_dash="dot",
+                       line_shape='spline'),
+            go.Scatter(name="High ball",
+                       x=x,
+                       y=high_y_traj,
+                       mode="lines",
+                       line_dash="dot",
+                       line_shape='spline')
+        ])
+
+        return fig, min_u, np.arctan(min_tan_theta), np.arctan(low_tan_theta), np.arctan(
+            high_tan_theta)
+    else:
+        return fig, min_u, np.arctan(min_tan_theta), None, None
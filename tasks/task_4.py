@@ -0,0 +1,149 @@
+import base64
+
+import plotly.graph_objects as go
+import numpy as np
+
+import config
+from physics import analytic
+from tasks import scaling
+
+PLOT_DEFAULTS = {"theta": 60.0, "g": 9.81, "u": 10.0, "h": 2.0}
+HEATMAP_DEFAULTS = {"g": 9.81, "h": 2.0, "u_max": 20.0, "quantity": "range"}
+
+QUANTITIES = {"range": ("Range", "R", "m"), "flight_time": ("Flight Time", "T", "s")}
+
+
+@np.errstate(divide="raise", invalid="raise")
+def generate_task_4(*, theta: float, g: float, u: float, h: float):
+    # inputted trajectory
+    total_t = analytic.flight_time(theta=theta, u=u, h=h, g=g)
+    inputted = analytic.trajectory(np.linspace(0, total_t, config.GRAPH_SAMPLES),
+                                   theta=theta,
+                                   u=u,
+                                   h=h,
+                                   g=g)
+    range = inputted.event("range").x
+
+    # maximize range
+    theta_max = analytic.max_range_angle(u=u, h=h, g=g)
+    max_range_t = analytic.flight_time(theta=theta_max, u=u, h=h, g=g)
+    range_max = analytic.max_range(u=u, h=h, g=g)
+
+    max_range = analytic.trajectory(np.linspace(0, max_range_t, config.GRAPH_SAMPLES),
+                                    theta=theta_max,
+                                    u=u,
+                                    h=h,
+                                    g=g)
+
+    fig = go.Figure(
+        data=[
+            go.Scatter(name="Trajectory",
+                       x=inputted.x,
+                       y=inputted.y,
+                       mode="lines",
+                       line_shape='spline'),
+            go.Scatter(name="Max Range",
+                       x=max_range.x,
+                       y=max_range.y,
+                       mode="lines",
+                       line_dash="dashdot",
+                       line_shape='spline'),
+            go.Scatter(name="Range",
+                       x=[range],
+                       y=[0],
+                       texttemplate="(%{x:.2f}, 0)",
+                       textposition="top center",
+                       textfont=dict(size=14),
+                       marker_symbol="x",
+                       marker=dict(size=11),
+                       mode='markers+text',
+                       showlegend=False),
+            go.Scatter(name="Max. Range",
+                       x=[range_max],
+                       y=[0],
+                       texttemplate="(%{x:.2f}, 0)",
+                       textposition="bottom center",
+                       textfont=dict(size=14),
+                       marker_symbol="x",
+                       marker=dict(size=11),
+                       mode='markers+text',
+                       showlegend=False),
+        ],
+        layout=config.GO_BASE_LAYOUT,
+    )
+
+    fig.update_layout(
+        title_text="Analytical Model",
+        xaxis_title="x (m)",
+        yaxis_title="y (m)",
+    )
+
+    return fig, range, total_t, theta_max, range_max, max_range_t
+
+
+def _rescale(result, *, length: float, time: float):
+    fig, range, total_t, theta_max, range_max, max_range_t = result
+    return (scaling.scale_figure(fig, x=length, y=length), range * length, total_t * time, theta_max,
+            range_max * length, max_range_t * time)
+
+
+SCALING = scaling.Scaling(rescale=_rescale)
+
+
+def _typed_array(z: np.ndarray) -> dict:
+    # float32 data in the base64 typed array form read by plotly.js, far smaller and faster than a JSON list
+    z = np.ascontiguousarray(z, dtype="<f4")
+    return dict(dtype="f4", bdata=base64.b64encode(z).decode(), shape=",".join(map(str, z.shape)))
+
+
+@np.errstate(divide="raise", invalid="raise")
+def generate_task_4_heatmap(*, g: float, h: float, u_max: float, quantity: str):
+    n_theta, n_u = config.HEATMAP_SAMPLES
+    theta = np.linspace(0, 90, n_theta)
+    u = np.linspace(0, u_max, n_u)
+
+    # the whole (speed, angle) plane in one broadcast; launches from below the ground that never reach
+    # y = 0 are left blank, as is the optimal angle where they just reach it (2 + 2gh/u² = 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        total_t = analytic.flight_time(theta=theta, u=u[:, None], h=h, g=g)
+        z = total_t if quantity == "flight_time" else analytic.components(theta=theta, u=u[:, None])[0] * total_t
+
+        # angle of maximum range for every speed, where there is one
+        theta_max = analytic.max_range_angle(u=u[1:], h=h, g=g)
+    ridge = np.isfinite(theta_max)
+
+    name, symbol, unit = QUANTITIES[quantity]
+    fig = go.Figure(
+        dict(data=[
+            dict(type="heatmap",
+                 name=name,
+                 z=_typed_array(z),
+                 x0=0,
+                 dx=theta[1],
+                 y0=0,
+                 dy=u[1],
+                 colorscale="Viridis",
+                 colorbar=dict(title=f"{symbol} ({unit})"),
+                 hovertemplate=f"θ = %{{x:.2f}}°<br>u = %{{y:.2f}} m/s<br>{symbol} = %{{z:.3f}} {unit}"
+                 "<extra></extra>"),
+            dict(type="scatter",
+                 name="Optimal Angle",
+                 x=theta_max[ridge],
+                 y=u[1:][ridge],
+                 mode="lines",
+                 line=dict(color="white", dash="dash"),
+                 hovertemplate="θ = %{x:.2f}°<br>u = %{y:.2f} m/s<extra>Optimal Angle</extra>"),
+        ],
+             layout=config.GO_BASE_LAYOUT),
+        # the heatmap is a typed array, which plotly.py 5 cannot validate but plotly.js reads directly
+        _validate=False,
+    )
+
+    fig.update_layout(
+        title_text=f"{name} over Launch Angle and Speed",
+        xaxis_title="θ (deg)",
+        yaxis_title="u (m/s)",
+        legend=dict(x=1, y=1.08, xanchor="right", orientation="h"),
+    )
+
+    return fig
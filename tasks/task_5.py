@@ -0,0 +1,98 @@
+import plotly.graph_objects as go
+import numpy as np
+
+import config
+from physics import analytic
+
+PLOT_DEFAULTS = {"target_x": 15.0, "target_y": 15.0, "g": 9.81, "u": 20.0, "h": 0.0}
+
+
+@np.errstate(divide="raise", invalid="raise")
+def generate_task_5(*, target_x: float, target_y: float, g: float, u: float, h: float):
+    min_u, min_tan_theta = analytic.min_speed_to_target(X=target_x, Y=target_y, h=h, g=g)
+
+    # min vel trajectory
+    min_x = analytic.landing_distance(tan_theta=min_tan_theta, u=min_u, h=h, g=g)
+    min_x_traj = np.linspace(0, min_x, config.GRAPH_SAMPLES)
+    min_y_traj = analytic.height_at_tan(min_x_traj, tan_theta=min_tan_theta, u=min_u, h=h, g=g)
+
+    # max range (used for both max range and bounding parabola calculation)
+    max_x = analytic.max_range(u=u, h=h, g=g)
+    bound_x = np.linspace(0, max_x, config.GRAPH_SAMPLES)
+
+    bound_parabola = analytic.bounding_parabola(bound_x, u=u, h=h, g=g)
+    max_range_y = analytic.max_range_height(bound_x, u=u, h=h, g=g)
+
+    fig = go.Figure(
+        data=[
+            go.Scatter(name="Min. Velocity",
+                       x=min_x_traj,
+                       y=min_y_traj,
+                       mode="lines",
+                       line_shape='spline'),
+            go.Scatter(name="Target",
+                       x=[target_x],
+                       y=[target_y],
+                       text=[f"({target_x}, {target_y})"],
+                       textposition="bottom center",
+                       textfont=dict(size=15),
+                       marker_symbol="x",
+                       marker=dict(size=11),
+                       mode='markers+text'),
+            go.Scatter(name="Bounding Parabola",
+                       x=bound_x,
+                       y=bound_parabola,
+                       mode="lines",
+                       line_dash="longdash",
+                       line_shape='spline'),
+            go.Scatter(name="Max. Range",
+                       x=bound_x,
+                       y=max_range_y,
+                       mode='lines',
+                       line_dash="dashdot",
+                       line_shape='spline')
+        ],
+        layout=config.GO_BASE_LAYOUT,
+    )
+
+    fig.update_layout(
+        title_text="Hitting a Target",
+        xaxis_title="x (m)",
+        yaxis_title="y (m)",
+    )
+
+    if u > min_u:
+        # find high and low ball trajectories
+        low_tan_theta, high_tan_theta = analytic.target_tan_angles(X=target_x,
+                                                                   Y=target_y,
+                                                                   u=u,
+                                                                   h=h,
+                                                                   g=g)
+
+        low_x = analytic.landing_distance(tan_theta=low_tan_theta, u=u, h=h, g=g)
+        low_x_list = np.linspace(0, low_x, config.GRAPH_SAMPLES)
+        low_y_traj = analytic.height_at_tan(low_x_list, tan_theta=low_tan_theta, u=u, h=h, g=g)
+
+        high_x = analytic.landing_distance(tan_theta=high_tan_theta, u=u, h=h, g=g)
+        high_x_list = np.linspace(0, high_x, config.GRAPH_SAMPLES)
+        high_y_traj = analytic.height_at_tan(high_x_list, tan_theta=high_tan_theta, u=u, h=h, g=g)
+
+        fig.add_traces(data=[
+            go.Scatter(name="Low Ball",
+                       x=low_x_list,
+                       y=low_y_traj,
+                       mode="lines",
+                       line_dash="dot",
+                       line_shape='spline'),
+            go.Scatter(name="High Ball",
+                       x=high_x_list,
+                       y=high_y_traj,
+                       mode="lines",
+                       line_dash="dot",
+                       line_shape='spline')
+        ])
+
+        return fig, min_u, np.arctan(min_tan_theta), np.arctan(low_tan_theta), np.arctan(
+            high_tan_theta)
+    else:
+        return fig, min_u, np.arctan(min_tan_theta), None, None
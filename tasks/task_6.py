@@ -0,0 +1,85 @@
+import plotly.graph_objects as go
+import numpy as np
+
+import config
+from physics import analytic
+from tasks import scaling
+
+PLOT_DEFAULTS = {"theta": 60.0, "g": 9.81, "u": 10.0, "h": 2.0}
+
+
+@np.errstate(divide="raise", invalid="raise")
+def generate_task_6(*, theta: float, g: float, u: float, h: float):
+    # inputted trajectory
+    total_t = analytic.flight_time(theta=theta, u=u, h=h, g=g)
+    inputted = analytic.trajectory(np.linspace(0, total_t, config.GRAPH_SAMPLES),
+                                   theta=theta,
+                                   u=u,
+                                   h=h,
+                                   g=g)
+    range = inputted.event("range").x
+    dist = analytic.arc_length(range, theta=theta, u=u, g=g)
+
+    # maximize range
+    theta_max = analytic.max_range_angle(u=u, h=h, g=g)
+    max_range_t = analytic.flight_time(theta=theta_max, u=u, h=h, g=g)
+    range_max = analytic.max_range(u=u, h=h, g=g)
+    max_dist = analytic.arc_length(range_max, theta=theta_max, u=u, g=g)
+
+    max_range = analytic.trajectory(np.linspace(0, max_range_t, config.GRAPH_SAMPLES),
+                                    theta=theta_max,
+                                    u=u,
+                                    h=h,
+                                    g=g)
+
+    fig = go.Figure(
+        data=[
+            go.Scatter(name="Trajectory",
+                       x=inputted.x,
+                       y=inputted.y,
+                       mode="lines",
+                       line_shape='spline'),
+            go.Scatter(name="Max Range",
+                       x=max_range.x,
+                       y=max_range.y,
+                       mode="lines",
+                       line_dash="dashdot",
+                       line_shape='spline'),
+            go.Scatter(name="Range",
+                       x=[range],
+                       y=[0],
+                       texttemplate="(%{x:.2f}, 0)",
+                       textposition="top center",
+                       textfont=dict(size=14),
+                       marker_symbol="x",
+                       marker=dict(size=11),
+                       mode='markers+text',
+                       showlegend=False),
+            go.Scatter(name="Max. Range",
+                       x=[range_max],
+                       y=[0],
+                       texttemplate="(%{x:.2f}, 0)",
+                       textposition="bottom center",
+                       textfont=dict(size=14),
+                       marker_symbol="x",
+                       marker=dict(size=11),
+                       mode='markers+text',
+                       showlegend=False),
+        ],
+        layout=config.GO_BASE_LAYOUT,
+    )
+
+    fig.update_layout(title_text="Arc Length of Projectile Motion (with Analytical Model)",
+                      xaxis_title="x (m)",
+                      yaxis_title="y (m)")
+
+    return fig, range, total_t, theta_max, range_max, max_range_t, dist, max_dist
+
+
+def _rescale(result, *, length: float, time: float):
+    fig, range, total_t, theta_max, range_max, max_range_t, dist, max_dist = result
+    return (scaling.scale_figure(fig, x=length, y=length), range * length, total_t * time, theta_max,
+            range_max * length, max_range_t * time, dist * length, max_dist * length)
+
+
+SCALING = scaling.Scaling(rescale=_rescale)
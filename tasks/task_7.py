@@ -0,0 +1,126 @@
+import plotly.graph_objects as go
+import numpy as np
+
+import config
+from physics import analytic
+
+PLOT_DEFAULTS = {"g": 9.81, "u": 10.0, "h": 2.0}
+
+ANGLES = (30, 45, 60, 70.5, 78, 85)
+
+
+@np.errstate(divide="raise", invalid="raise")
+def generate_task_7(*, u: float, g: float, h: float):
+    fig1 = go.Figure(
+        layout=(config.GO_BASE_LAYOUT |
+                dict(title_text="Range vs. Time", xaxis_title="t (s)", yaxis_title="r (m)")))
+
+    fig2 = go.Figure(layout=dict(**config.GO_BASE_LAYOUT,
+                                 title_text="XY Graph",
+                                 xaxis_title="x (m)",
+                                 yaxis_title="y (m)"))
+
+    for theta in ANGLES:
+        total_t = analytic.flight_time(theta=theta, u=u, h=h, g=g)
+
+        t = np.linspace(0, total_t, config.GRAPH_SAMPLES)
+        range = analytic.range_from_origin(t, theta=theta, u=u, g=g)
+
+        fig1.add_trace(
+            go.Scatter(name=rf"{theta} deg", x=t, y=range, mode="lines", line_shape="spline"))
+
+        # Using what we did in task 2 for figure
+        total_x, _ = analytic.position(total_t, theta=theta, u=u, h=h, g=g)
+
+        x = np.linspace(0, total_x, config.GRAPH_SAMPLES)
+        y = analytic.height_at(x, theta=theta, u=u, h=h, g=g)
+
+        fig2.add_trace(
+            go.Scatter(name=rf"{theta} deg", x=x, y=y, mode="lines", line_shape="spline"))
+
+    # r only has a minimum and a maximum above the critical angle
+    steep = np.array([theta for theta in ANGLES if theta > 70.5])
+    minima_x, maxima_x = analytic.range_extrema_times(theta=steep, u=u, g=g)
+
+    minima_y = analytic.range_from_origin(minima_x, theta=steep, u=u, g=g)
+    maxima_y = analytic.range_from_origin(maxima_x, theta=steep, u=u, g=g)
+
+    xy_minima_x, xy_minima_y = analytic.position(minima_x, theta=steep, u=u, h=h, g=g)
+    xy_maxima_x, xy_maxima_y = analytic.position(maxima_x, theta=steep, u=u, h=h, g=g)
+
+    fig1.add_traces(data=[
+        go.Scatter(
+            name="Minima",
+            x=minima_x,
+            y=minima_y,
+            textfont=dict(size=14),
+            marker_symbol="x",
+            marker=dict(size=8, color="deepskyblue"),
+            mode='markers+text',
+        ),
+        go.Scatter(
+            name="Maxima",
+            x=maxima_x,
+            y=maxima_y,
+            textfont=dict(size=14),
+            marker_symbol="x",
+            marker=dict(size=8, color="limegreen"),
+            mode='markers+text',
+        )
+    ])
+
+    # plot corresponding points on XY graph
+    fig2.add_traces(data=[
+        go.Scatter(
+            name="r vs. t Minima",
+            x=xy_minima_x,
+            y=xy_minima_y,
+            textfont=dict(size=14),
+            marker_symbol="x",
+            marker=dict(size=8, color="deepskyblue"),
+            mode='markers+text',
+        ),
+        go.Scatter(
+            name="r vs. t Maxima",
+            x=xy_maxima_x,
+            y=xy_maxima_y,
+            textfont=dict(size=14),
+            marker_symbol="x",
+            marker=dict(size=8, color="limegreen"),
+            mode='markers+text',
+        )
+    ])
+
+    # Point of equality (ie having one saddle point instead of a maxima and minima)
+    saddle_x = analytic.saddle_time(u=u, g=g)
+    saddle_y = analytic.range_from_origin(saddle_x, theta=analytic.SADDLE_ANGLE, u=u, g=g)
+    fig1.add_trace(
+        go.Scatter(
+            name='Saddle Point',
+            x=[saddle_x],
+            y=[saddle_y],
+            textfont=dict(size=14),
+            marker_symbol="x",
+            marker=dict(size=8, color="salmon"),
+            mode='markers+text',
+        ))
+
+    # plot corresponding point on XY graph
+    xy_saddle_x, xy_saddle_y = analytic.position(saddle_x,
+                                                 theta=analytic.SADDLE_ANGLE,
+                                                 u=u,
+                                                 h=h,
+                                                 g=g)
+
+    fig2.add_trace(
+        go.Scatter(
+            name='Saddle Point',
+            x=[xy_saddle_x],
+            y=[xy_saddle_y],
+            textfont=dict(size=14),
+            marker_symbol="x",
+            marker=dict(size=8, color="salmon"),
+            mode='markers+text',
+        ))
+
+    return fig1, fig2
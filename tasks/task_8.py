@@ -0,0 +1,209 @@
+from math import ceil
+from time import perf_counter
+
+import plotly.graph_objects as go
+import plotly.io as pio
+import numpy as np
+
+import config
+import diagnostics
+import metrics
+from physics import bounce, budget
+from physics.trajectory import Trajectory
+
+PLOT_DEFAULTS = {
+    "theta": 45.0,
+    "g": 9.81,
+    "u": 6.0,
+    "h": 2.0,
+    "dt": 0.02,
+    "C": 0.7,
+    "N": 6,
+    "method": "exact",
+    "min_height": 0.001
+}
+
+METHODS = {"exact": "Exact (closed form bounces)", "verlet": "Verlet (fixed time step)"}
+
+
+def _bounce_path(*, theta: float, g: float, u: float, h: float, dt: float, C: float, N: int,
+                 method: str, min_height: float, dense: bool = False):
+    """Path of the bouncing projectile from `method`, or the method it fell back to, with its notes.
+
+    Exact bounces are sampled as finely as the plot needs, or about every dt
+    when `dense`.
+    """
+    notes = []
+    if method == "verlet":
+        # the exact bounces give the flight time, and so the number of fixed steps needed
+        estimate = bounce.bounce_arcs(theta=theta, g=g, u=u, h=h, C=C, N=N, min_height=min_height)
+        steps = estimate.total_t / dt if dt > 0 else float("inf")
+        try:
+            budget.require(steps=steps,
+                           max_steps=config.MAX_STEPS,
+                           nbytes=budget.trajectory_bytes(steps=steps, columns=5),
+                           max_bytes=config.MAX_COMPUTE_BYTES)
+        except budget.BudgetExceeded as e:
+            method = "exact"
+            notes.append(f"With this time interval the Verlet method {e}, "
+                         "so the exact bounces are shown instead.")
+
+    if method == "exact":
+        # every arc is an exact parabola and bounce times form a geometric series, so any N (and the
+        # time to rest) is found in constant time and only sampled as finely as the plot needs
+        arcs = bounce.bounce_arcs(theta=theta, g=g, u=u, h=h, C=C, N=N, min_height=min_height)
+        if dense and dt > 0:
+            samples = int(min(arcs.shown_t / dt, config.MAX_STEPS)) + 1
+        else:
+            samples = config.GRAPH_SAMPLES * min(len(arcs.t), 10)
+        path = arcs.trajectory(samples)
+
+        total_t = arcs.shown_t
+        rest_t, rest_x = arcs.rest_t, arcs.rest_x
+        steps = len(arcs.t)
+        if arcs.clipped:
+            notes.append(f"Only the first {len(arcs.t):,} bounces above the rolling threshold are shown, "
+                         f"ending at {total_t:.3f} s; all {N:,} would take {arcs.end_t:.3f} s.")
+    else:
+        with budget.expect(estimate.total_t):
+            path = bounce.verlet_bounces(theta=theta,
+                                         g=g,
+                                         u=u,
+                                         h=h,
+                                         dt=dt,
+                                         C=C,
+                                         N=N,
+                                         min_height=min_height,
+                                         max_steps=config.MAX_STEPS)
+        steps = len(path)
+        # the estimate assumes no energy is gained, which coarse steps can do with C close to 1
+        bounces = sum(event.kind == "impact" for event in path.events)
+        if steps >= config.MAX_STEPS:
+            notes.append(f"The Verlet method reached the limit of {config.MAX_STEPS:,} steps before "
+                         "the last bounce, so the path stops there.")
+        elif bounces < N:
+            notes.append(f"The ball was treated as rolling after {bounces:,} of {N:,} bounces, once they "
+                         "were below the rolling threshold or too low for the time interval to resolve.")
+        total_t = path.t[-1] if steps else 0.0
+        rest_t = rest_x = None
+
+    return path, total_t, rest_t, rest_x, method, steps, notes
+
+
+@np.errstate(divide="raise", invalid="raise")
+def generate_task_8(*, theta: float, g: float, u: float, h: float, dt: float, C: float, N: int,
+                    method: str, min_height: float):
+    with diagnostics.phase("physics"):
+        path, total_t, rest_t, rest_x, method, steps, notes = _bounce_path(theta=theta,
+                                                                           g=g,
+                                                                           u=u,
+                                                                           h=h,
+                                                                           dt=dt,
+                                                                           C=C,
+                                                                           N=N,
+                                                                           method=method,
+                                                                           min_height=min_height)
+
+        # thin out the plotted path for small dt, keeping every bounce
+        path = path.thin(config.MAX_PLOT_POINTS, keep=np.flatnonzero(path.y == 0))
+
+    metrics.integration_steps.observe(steps, page="task_8", method=method)
+
+    build_start = perf_counter()
+
+    # play back in real time at a fixed frame rate, with a bounded number of frames however
+    # small dt is; the transition between frames fills in the motion
+    frames_n = min(ceil(total_t * config.ANIMATION_FPS), config.ANIMATION_MAX_FRAMES) + 1
+    frame_t = np.linspace(0, total_t, frames_n)
+    frame_x = np.interp(frame_t, path.t, path.x)
+    frame_y = np.interp(frame_t, path.t, path.y)
+    # a launch that never leaves the ground (e.g. h = 0 and theta = 0) is a single still frame
+    animation_speed = total_t * 1000 / (frames_n - 1) if frames_n > 1 else 0  # sec -> ms
+
+    fig = go.Figure(
+        data=[
+            go.Scatter(x=path.x, y=path.y, mode="lines", line_shape='spline'),
+            go.Scatter(x=frame_x[:1],
+                       y=frame_y[:1],
+                       mode="markers",
+                       marker=dict(color="red", size=10)),
+        ],
+        # frames only carry the new marker position and update the marker trace
+        frames=[
+            go.Frame(data=[dict(x=[x], y=[y])], traces=[1])
+            for x, y in zip(frame_x.tolist(), frame_y.tolist())
+        ],
+        layout=config.GO_BASE_LAYOUT,
+    )
+
+    fig.update_layout(
+        title_text="Bouncing Projectile",
+        xaxis_title="x (m)",
+        yaxis_title="y (m)",
+        hovermode="closest",
+        width=800,
+        height=550,
+        autosize=False,
+        margin=dict(t=150),
+        xaxis=dict(range=[0, path.x.max(initial=0) + 1], autorange=False),
+        yaxis=dict(range=[0, path.y.max(initial=0) + 1], autorange=False),
+        updatemenus=[
+            dict(type="buttons",
+                 buttons=[
+                     dict(label="Play",
+                          method="animate",
+                          args=[
+                              None,
+                              dict(frame=dict(duration=animation_speed, redraw=False),
+                                   fromcurrent=True,
+                                   transition=dict(duration=animation_speed,
+                                                   easing="linear"))
+                          ]),
+                     dict(label="Pause",
+                          method="animate",
+                          args=[[None],
+                                dict(frame=dict(duration=0, redraw=False),
+                                     mode="immediate",
+                                     transition=dict(duration=0))])
+                 ],
+                 direction="left",
+                 pad=dict(r=10, t=10),
+                 xanchor="left",
+                 yanchor="top",
+                 x=0.06,
+                 y=1.18,
+                 showactive=False)
+        ],
+        annotations=[
+            dict(text="Animate:",
+                 showarrow=False,
+                 x=0,
+                 y=1.15,
+                 font=dict(size=18),
+                 yref="paper",
+                 align="right")
+        ],
+        showlegend=False,
+    )
+
+    build_time = perf_counter() - build_start
+    payload = len(pio.to_json(fig, validate=False))
+
+    return fig, total_t, rest_t, rest_x, (frames_n, build_time, payload), notes
+
+
+@np.errstate(divide="raise", invalid="raise")
+def export_task_8(*, theta: float, g: float, u: float, h: float, dt: float, C: float, N: int,
+                  method: str, min_height: float) -> Trajectory:
+    """Path at full resolution, for `exports`: every Verlet step, or exact bounces about every dt."""
+    path, *_ = _bounce_path(theta=theta,
+                            g=g,
+                            u=u,
+                            h=h,
+                            dt=dt,
+                            C=C,
+                            N=N,
+                            method=method,
+                            min_height=min_height,
+                            dense=True)
+    return path
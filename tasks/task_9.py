@@ -0,0 +1,315 @@
+import plotly.graph_objects as go
+import numpy as np
+
+import config
+import diagnostics
+import metrics
+import tables
+from physics import analytic, budget, drag, drag_table
+from physics.trajectory import Trajectory
+
+PLOT_DEFAULTS = {
+    "theta": 30.0,
+    "g": 9.81,
+    "u": 20.0,
+    "h": 2.0,
+    'Cd': 1.0,
+    'a': 0.007854,
+    'P': 1.0,
+    'm': 0.1,
+    "dt": 0.01,
+    "method": "verlet",
+    "tol": 1e-6
+}
+
+# opened on first use of the lookup table method
+DRAG_TABLE = tables.Table(config.DRAG_TABLE_PATH,
+                          kind="drag",
+                          version=drag_table.VERSION,
+                          shape=drag_table.SHAPE)
+
+METHODS = {
+    "verlet": "Verlet (fixed time step)",
+    "rk45": "Dormand–Prince RK45 (adaptive)",
+    "table": "Lookup table (interpolated)"
+}
+
+
+def _drag_path(*, theta: float, u: float, h: float, g: float, k: float, dt: float, method: str,
+               tol: float, span: float, samples: int):
+    """Drag included path from `method`, or the method it fell back to, with its steps and notes.
+
+    `span` is the drag free flight time, used to report progress, and RK45
+    solutions and table lookups are sampled at `samples` evenly spaced times.
+    """
+    notes = []
+    if method == "table":
+        # answered from the precomputed table when inside it and accurate enough, otherwise integrated
+        table = DRAG_TABLE.get()
+        found = None
+        if table is not None:
+            found = drag_table.lookup(table, theta=theta, u=u, h=h, g=g, k=k, samples=samples)
+        if found is None:
+            method = "rk45"
+            reason = "is not available" if table is None else "does not cover these inputs"
+            notes.append(f"The lookup table {reason}, so the RK45 method was used instead.")
+        elif found.error > config.MAX_TABLE_ERROR:
+            method = "rk45"
+            notes.append(f"The estimated error of the lookup table here ({found.error:.1e}) is above the "
+                         f"limit of {config.MAX_TABLE_ERROR:.0e}, so the RK45 method was used instead.")
+        else:
+            notes.append(f"Interpolated from the lookup table, with an estimated relative error of "
+                         f"{found.error:.1e}.")
+
+    # launches from the ground only leave it when aimed upward
+    if method == "verlet" and (h > 0 or u * np.sin(np.radians(theta)) > 0):
+        # a coarse adaptive solution gives the flight time, and so the number of fixed steps needed
+        estimate = span = drag.integrate_rk45(theta=theta, u=u, h=h, g=g, k=k, tol=1e-3).flight_time
+        steps = estimate / dt if dt > 0 else float("inf")
+        try:
+            budget.require(steps=steps,
+                           max_steps=config.MAX_STEPS,
+                           nbytes=budget.verlet_bytes(steps=steps, launches=1),
+                           max_bytes=config.MAX_COMPUTE_BYTES)
+        except budget.BudgetExceeded as e:
+            method = "rk45"
+            notes.append(f"With this time step the Verlet method {e}, "
+                         "so the RK45 method was used instead.")
+
+    if method == "table":
+        total_t_drag = found.flight_time
+        steps = 0
+
+        path = found.trajectory
+    elif method == "rk45":
+        # adaptive steps land exactly on y = 0, so the dense output is sampled evenly up to it
+        with budget.expect(span):
+            solution = drag.integrate_rk45(theta=theta, u=u, h=h, g=g, k=k, tol=tol)
+
+        total_t_drag = solution.flight_time
+        steps = solution.steps
+
+        path = solution.trajectory(np.linspace(0, total_t_drag, samples))
+    else:
+        with budget.expect(span):
+            result = drag.integrate_verlet(theta=theta, u=u, h=h, g=g, k=k, dt=dt)
+
+        total_t_drag = result.flight_time[0]
+        steps = result.steps[0]
+
+        path = result.trajectory(0)
+
+    return path, total_t_drag, method, steps, notes
+
+
+@np.errstate(divide="raise", invalid="raise")
+def generate_task_9(*, theta: float, u: float, h: float, g: float, Cd: float, a: float,
+                    P: float, m: float, dt: float, method: str, tol: float):
+    #Drag Free Model As in Task 2
+
+    total_t = analytic.flight_time(theta=theta, u=u, h=h, g=g)
+    drag_free = analytic.trajectory(np.linspace(0, total_t, config.GRAPH_SAMPLES),
+                                    theta=theta,
+                                    u=u,
+                                    h=h,
+                                    g=g)
+    drag_free_apogee = drag_free.event("apogee")
+    drag_free_v = np.hypot(drag_free.vx, drag_free.vy)
+
+    #Resistance Included Model Using Verlet Method or RK45
+
+    with diagnostics.phase("physics"):
+        k = drag.drag_factor(Cd=Cd, P=P, a=a, m=m)
+        path, total_t_drag, method, steps, notes = _drag_path(theta=theta,
+                                                              u=u,
+                                                              h=h,
+                                                              g=g,
+                                                              k=k,
+                                                              dt=dt,
+                                                              method=method,
+                                                              tol=tol,
+                                                              span=total_t,
+                                                              samples=config.GRAPH_SAMPLES)
+
+        # thin out the plotted path for small dt, keeping the first and last states
+        path = path.thin(config.MAX_PLOT_POINTS)
+
+    if method != "table":
+        metrics.integration_steps.observe(steps, page="task_9", method=method)
+
+    drag_apogee = path.event("apogee")
+    drag_v = np.hypot(path.vx, path.vy)
+
+    y_x = go.Figure(
+        layout=config.GO_BASE_LAYOUT,
+        data=[
+            go.Scatter(name="Drag Included",
+                       x=path.x,
+                       y=path.y,
+                       mode="lines",
+                       line_shape='spline'),
+            go.Scatter(name="Drag Free",
+                       x=drag_free.x,
+                       y=drag_free.y,
+                       mode="lines",
+                       line_dash="dashdot",
+                       line_shape='spline'),
+            go.Scatter(name="Drag Included Apogee (Approx.)",
+                       x=[drag_apogee.x],
+                       y=[drag_apogee.y],
+                       text=[f"({drag_apogee.x:.2f}, {drag_apogee.y:.2f})"],
+                       textposition="bottom center",
+                       textfont=dict(size=14),
+                       marker_symbol="0",
+                       marker=dict(size=8),
+                       mode='markers+text'),
+            go.Scatter(name="Drag Free Apogee",
+                       x=[drag_free_apogee.x],
+                       y=[drag_free_apogee.y],
+                       text=[f"({drag_free_apogee.x:.2f}, {drag_free_apogee.y:.2f})"],
+                       textposition="bottom center",
+                       textfont=dict(size=14),
+                       marker_symbol="0",
+                       marker=dict(size=8),
+                       mode='markers+text'),
+            go.Scatter(name="Drag Included Range",
+                       x=[path.x[-1]],
+                       y=[0],
+                       text=[f"({path.x[-1]:.2f}, {0})"],
+                       textposition="top center",
+                       textfont=dict(size=14),
+                       marker_symbol="x",
+                       marker=dict(size=11),
+                       mode='markers+text',
+                       showlegend=False),
+            go.Scatter(name="Drag Free Range",
+                       x=[drag_free.x[-1]],
+                       y=[0],
+                       text=[f"({drag_free.x[-1]:.2f}, {0})"],
+                       textposition="top center",
+                       textfont=dict(size=14),
+                       marker_symbol="x",
+                       marker=dict(size=11),
+                       mode='markers+text',
+                       showlegend=False)
+        ],
+    )
+
+    y_x.update_layout(
+        title_text="Projectile Motion Model",
+        xaxis_title="x (m)",
+        yaxis_title="y (m)",
+    )
+
+    y_t = go.Figure(
+        layout=config.GO_BASE_LAYOUT,
+        data=[
+            go.Scatter(name="Drag Included",
+                       x=path.t,
+                       y=path.y,
+                       mode="lines",
+                       line_shape='spline'),
+            go.Scatter(name="Drag Free",
+                       x=drag_free.t,
+                       y=drag_free.y,
+                       mode="lines",
+                       line_dash="dashdot",
+                       line_shape='spline'),
+        ],
+    )
+
+    y_t.update_layout(
+        title_text="Y Position vs. Time",
+        xaxis_title="t (s)",
+        yaxis_title="y (m)",
+    )
+
+    vx_t = go.Figure(
+        layout=config.GO_BASE_LAYOUT,
+        data=[
+            go.Scatter(name="Drag Included",
+                       x=path.t,
+                       y=path.vx,
+                       mode="lines",
+                       line_shape='spline'),
+            go.Scatter(name="Drag Free",
+                       x=drag_free.t,
+                       y=drag_free.vx,
+                       mode="lines",
+                       line_dash="dashdot",
+                       line_shape='spline')
+        ],
+    )
+
+    vx_t.update_layout(
+        title_text="X Velocity vs. Time",
+        xaxis_title="t (s)",
+        yaxis_title="vx (ms⁻¹)",
+    )
+
+    vy_t = go.Figure(
+        layout=config.GO_BASE_LAYOUT,
+        data=[
+            go.Scatter(name="Drag Included",
+                       x=path.t,
+                       y=path.vy,
+                       mode="lines",
+                       line_shape='spline'),
+            go.Scatter(name="Drag Free",
+                       x=drag_free.t,
+                       y=drag_free.vy,
+                       mode="lines",
+                       line_dash="dashdot",
+                       line_shape='spline')
+        ],
+    )
+
+    vy_t.update_layout(
+        title_text="Y Velocity vs. Time",
+        xaxis_title="t (s)",
+        yaxis_title="vy (ms⁻¹)",
+    )
+
+    v_t = go.Figure(
+        layout=config.GO_BASE_LAYOUT,
+        data=[
+            go.Scatter(name="Drag Included",
+                       x=path.t,
+                       y=drag_v,
+                       mode="lines",
+                       line_shape='spline'),
+            go.Scatter(name="Drag Free",
+                       x=drag_free.t,
+                       y=drag_free_v,
+                       mode="lines",
+                       line_dash="dashdot",
+                       line_shape='spline')
+        ],
+    )
+
+    v_t.update_layout(
+        title_text="Velocity vs. Time",
+        xaxis_title="t (s)",
+        yaxis_title="v (ms⁻¹)",
+    )
+
+    return y_x, y_t, vx_t, vy_t, v_t, total_t, total_t_drag, k, steps, notes
+
+
+@np.errstate(divide="raise", invalid="raise")
+def export_task_9(*, theta: float, u: float, h: float, g: float, Cd: float, a: float, P: float,
+                  m: float, dt: float, method: str, tol: float) -> Trajectory:
+    """Drag included path at full resolution, for `exports`: every Verlet step, or about every dt."""
+    total_t = analytic.flight_time(theta=theta, u=u, h=h, g=g)
+    samples = int(min(total_t / dt, config.MAX_STEPS)) + 1 if dt > 0 else config.MAX_PLOT_POINTS
+    path, *_ = _drag_path(theta=theta,
+                          u=u,
+                          h=h,
+                          g=g,
+                          k=drag.drag_factor(Cd=Cd, P=P, a=a, m=m),
+                          dt=dt,
+                          method=method,
+                          tol=tol,
+                          span=total_t,
+                          samples=samples)
+    return path
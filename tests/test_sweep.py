@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+import sweep
+from physics import drag
+
+
+def _params(**columns):
+    return sweep._params({name: np.asarray(value, dtype=float) for name, value in columns.items()})
+
+
+def _outputs(results):
+    return dict(zip(sweep.COLUMNS, results.T))
+
+
+def test_drag_from_the_ground():
+    params = _params(theta=[45.0], u=[20.0], h=[0.0])
+    out = _outputs(sweep.evaluate(params, dt=1e-3, max_steps=10**6, workers=1))
+    theta, u, h, g, Cd, m, a, P = params[0]
+    expected = drag.integrate_verlet(theta=theta,
+                                     u=u,
+                                     h=h,
+                                     g=g,
+                                     k=drag.drag_factor(Cd=Cd, P=P, a=a, m=m),
+                                     dt=1e-3,
+                                     record=False)
+
+    assert out["drag_flight_time"][0] > 0
+    assert out["drag_flight_time"][0] == pytest.approx(expected.flight_time[0])
+    assert out["drag_range"][0] == pytest.approx(expected.range[0])
+
+
+def test_drag_past_max_steps_is_nan():
+    # drag makes this fall far longer than the drag free one, which needs under 4000 steps
+    params = _params(theta=[0.0, 45.0], u=[5.0, 5.0], h=[50.0, 0.0], Cd=[50.0, 0.47])
+    out = _outputs(sweep.evaluate(params, dt=1e-3, max_steps=4000, workers=1))
+
+    assert out["flight_time"][0] < 4
+    for name in ("drag_flight_time", "drag_range", "drag_apogee_x", "drag_apogee_y"):
+        assert np.isnan(out[name][0])
+        assert np.isfinite(out[name][1])
@@ -0,0 +1,11 @@
+import numpy as np
+
+from tasks import task_4
+
+
+def test_heatmap_where_optimal_angle_is_undefined():
+    # u = 2 is on the speed grid, where 2 + 2gh/u² = 0 from h = -0.5 with g = 8
+    fig = task_4.generate_task_4_heatmap(g=8.0, h=-0.5, u_max=2.0, quantity="range")
+
+    ridge = fig.data[1]
+    assert np.all(np.isfinite(ridge.x))
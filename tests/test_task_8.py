@@ -0,0 +1,42 @@
+import pytest
+
+from physics import bounce
+from tasks import task_8
+
+
+@pytest.mark.parametrize("method", task_8.METHODS)
+@pytest.mark.parametrize("launch", [{"h": 0.0, "theta": 0.0}, {"h": 0.0, "u": 0.0}])
+def test_launch_along_the_ground(launch, method):
+    # never leaves the ground under the exact model, so the animation is a single frame
+    fig, total_t, *_ = task_8.generate_task_8(**task_8.PLOT_DEFAULTS | launch | {"method": method})
+
+    assert total_t >= 0
+    assert len(fig.frames) >= 1
+    if method == "exact":
+        assert total_t == 0
+        assert len(fig.frames) == 1
+
+
+def test_verlet_keeps_every_bounce_near_c_1():
+    # Verlet rebounds clamped at y = 0 are not always lower than the last, which is no reason to stop
+    inputs = task_8.PLOT_DEFAULTS | {"C": 0.95, "N": 30}
+    del inputs["method"], inputs["dt"]
+    arcs = bounce.bounce_arcs(**inputs)
+    path = bounce.verlet_bounces(**inputs, dt=task_8.PLOT_DEFAULTS["dt"])
+
+    assert len(arcs.t) == 30
+    assert sum(event.kind == "impact" for event in path.events) == len(arcs.t)
+    assert path.t[-1] >= arcs.total_t
+
+
+def test_exact_bounces_past_the_drawn_arcs():
+    # more bounces than are drawn: the motion stops at the last drawn impact, with a note
+    inputs = task_8.PLOT_DEFAULTS | {"C": 1.0, "N": 10_000}
+    fig, total_t, *_, notes = task_8.generate_task_8(**inputs)
+    del inputs["method"], inputs["dt"]
+    arcs = bounce.bounce_arcs(**inputs)
+
+    assert arcs.clipped
+    assert total_t == pytest.approx(arcs.impacts[-1])
+    assert fig.data[0].x[-1] == pytest.approx(arcs.ux * total_t)
+    assert len(notes) == 1
@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+from tasks import task_9
+
+
+@pytest.mark.skipif(task_9.DRAG_TABLE.get() is None, reason="drag table not built (build_tables.py)")
+def test_table_serves_default_inputs():
+    # the RK45 tolerance is per step and far below the interpolation error, so it must not reject these
+    *_, steps, notes = task_9.generate_task_9(**task_9.PLOT_DEFAULTS | {"method": "table"})
+
+    assert steps == 0
+    assert len(notes) == 1
+    assert notes[0].startswith("Interpolated from the lookup table")
+
+
+
+def test_verlet_launch_from_the_ground():
+    kwargs = task_9.PLOT_DEFAULTS | {"h": 0.0}
+    *_, verlet_t, _, steps, _ = task_9.generate_task_9(**kwargs | {"method": "verlet"})
+    *_, rk45_t, _, _, _ = task_9.generate_task_9(**kwargs | {"method": "rk45"})
+
+    assert steps > 0
+    assert verlet_t == pytest.approx(rk45_t, abs=kwargs["dt"])
+
+
+def test_verlet_launch_along_the_ground():
+    # never leaves the ground, so the path is the launch point alone
+    *_, total_t_drag, _, steps, _ = task_9.generate_task_9(**task_9.PLOT_DEFAULTS | {
+        "h": 0.0,
+        "theta": 0.0,
+        "method": "verlet"
+    })
+
+    assert total_t_drag == 0
+    assert steps == 0
+
+
+@pytest.mark.skipif(task_9.DRAG_TABLE.get() is None, reason="drag table not built (build_tables.py)")
+def test_table_export_is_sampled_about_every_dt():
+    table = task_9.export_task_9(**task_9.PLOT_DEFAULTS | {"method": "table"})
+    rk45 = task_9.export_task_9(**task_9.PLOT_DEFAULTS | {"method": "rk45"})
+
+    assert len(table) == len(rk45)
+    assert np.interp(rk45.t, table.t, table.y) == pytest.approx(rk45.y, abs=0.05)
@@ -1,10 +1,9 @@
 import streamlit as st
 
-import plotly.graph_objects as go
-import numpy as np
-
 import config
-from cache import cache_data_default
+from cache import cache_resource_default
+from physics import analytic
+from tasks import task_1
 
 st.set_page_config(page_title="Task 1", **config.PAGE_CONFIG)
 config.apply_custom_styles()
@@ -22,37 +21,13 @@ model_tab, math_tab, code_tab, = st.tabs(["Model", "Derivations", "Source Code"]
 # CODE
 # =====================
 
-PLOT_DEFAULTS = {"theta": 45.0, "g": 9.81, "u": 20.0, "h": 2.0, "dt": 0.10}
-
-with code_tab, st.echo():
-
-    @cache_data_default(**PLOT_DEFAULTS)
-    def generate_task_1(*, theta: float, g: float, u: float, h: float, dt: float):
-        from math import sin, cos, sqrt, radians
-
-        rad = radians(theta)
-
-        ux = u * sin(rad)
-        uy = u * cos(rad)
-
-        total_t = (uy + sqrt(uy**2 + 2 * g * h)) / g
-
-        t = np.arange(0, total_t, dt)
-        x = ux * t
-        y = h + uy * t - (g / 2) * t**2
-
-        fig = go.Figure(
-            data=[go.Scatter(x=x, y=y, mode="markers")],
-            layout=config.GO_BASE_LAYOUT,
-        )
+PLOT_DEFAULTS = task_1.PLOT_DEFAULTS
 
-        fig.update_layout(
-            title_text="Projectile Motion",
-            xaxis_title="x (m)",
-            yaxis_title="y (m)",
-        )
+generate_task_1 = cache_resource_default(scaling=task_1.SCALING,
+                                         **PLOT_DEFAULTS)(task_1.generate_task_1)
 
-        return fig, total_t
+with code_tab:
+    config.show_source(task_1, analytic)
 
 
 # =====================
@@ -83,7 +58,9 @@ with model_tab:
         submitted = st.form_submit_button("Generate")
 
     try:
-        fig, total_t = generate_task_1(theta=theta, g=gravity, u=vel, h=height, dt=dt)
+        fig, total_t, notes = generate_task_1(theta=theta, g=gravity, u=vel, h=height, dt=dt)
+        for note in notes:
+            st.warning(note, icon="⚠️")
 
         st.write("")
         f"""
@@ -91,7 +68,7 @@ with model_tab:
         
         **Flight Time**: {total_t:.3f} s
         """
-        st.plotly_chart(fig, **config.PLOTLY_CONFIG)
+        config.plotly_chart(fig)
     except Exception as e:
         st.exception(e)
 
@@ -1,10 +1,9 @@
 import streamlit as st
 
-import plotly.graph_objects as go
-import numpy as np
-
 import config
-from cache import cache_data_default
+from cache import cache_resource_default
+from physics import analytic
+from tasks import task_2
 
 st.set_page_config(page_title="Task 2", **config.PAGE_CONFIG)
 config.apply_custom_styles()
@@ -22,61 +21,13 @@ model_tab, math_tab, code_tab, = st.tabs(["Model", "Derivations", "Source Code"]
 # CODE
 # =====================
 
-PLOT_DEFAULTS = {"theta": 45.0, "g": 9.81, "u": 20.0, "h": 2.0}
-
-with code_tab, st.echo():
-
-    @cache_data_default(**PLOT_DEFAULTS)
-    def generate_task_2(*, theta: float, g: float, u: float, h: float):
-        from math import sin, cos, sqrt, radians
-
-        rad = radians(theta)
-
-        ux = u * cos(rad)
-        uy = u * sin(rad)
-
-        xa = ux * uy / g
-        ya = h + (uy**2) / 2 / g
-
-        total_t = (uy + sqrt(uy**2 + 2 * g * h)) / g
-        total_x = ux * total_t
-
-        x = np.linspace(0, total_x, config.GRAPH_SAMPLES)
-        y = h + (uy / ux) * x - (g / 2 / ux**2) * x**2
-
-        fig = go.Figure(
-            data=[
-                go.Scatter(name="Trajectory", x=x, y=y, mode="lines", line_shape='spline'),
-                go.Scatter(name="Apogee",
-                           x=[xa],
-                           y=[ya],
-                           text=[f"({xa:.2f}, {ya:.2f})"],
-                           textposition="bottom center",
-                           textfont=dict(size=14),
-                           marker_symbol="0",
-                           marker=dict(size=8),
-                           mode='markers+text'),
-                go.Scatter(name="Range",
-                           x=[total_x],
-                           y=[0],
-                           text=[f"({total_x:.2f}, {0})"],
-                           textposition="top center",
-                           textfont=dict(size=14),
-                           marker_symbol="x",
-                           marker=dict(size=11),
-                           mode='markers+text',
-                           showlegend=False)
-            ],
-            layout=config.GO_BASE_LAYOUT,
-        )
-
-        fig.update_layout(
-            title_text="Analytical Model",
-            xaxis_title="x (m)",
-            yaxis_title="y (m)",
-        )
-
-        return fig, (xa, ya), total_x, total_t
+PLOT_DEFAULTS = task_2.PLOT_DEFAULTS
+
+generate_task_2 = cache_resource_default(scaling=task_2.SCALING,
+                                         **PLOT_DEFAULTS)(task_2.generate_task_2)
+
+with code_tab:
+    config.show_source(task_2, analytic)
 
 
 # =====================
@@ -116,7 +67,7 @@ with model_tab:
         
         **Flight Time**: {total_t:.3f} s
         """
-        st.plotly_chart(fig, **config.PLOTLY_CONFIG)
+        config.plotly_chart(fig)
     except Exception as e:
         st.exception(e)
 
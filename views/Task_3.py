@@ -1,10 +1,9 @@
 import streamlit as st
 
-import plotly.graph_objects as go
-import numpy as np
-
 import config
-from cache import cache_data_default
+from cache import cache_resource_default
+from physics import analytic
+from tasks import task_3
 
 st.set_page_config(page_title="Task 3", **config.PAGE_CONFIG)
 config.apply_custom_styles()
@@ -22,76 +21,12 @@ model_tab, math_tab, code_tab, = st.tabs(["Model", "Derivations", "Source Code"]
 # CODE
 # =====================
 
-PLOT_DEFAULTS = {"target_x": 20.0, "target_y": 10.0, "g": 9.81, "u": 20.0, "h": 0.0}
-
-with code_tab, st.echo():
-
-    @cache_data_default(**PLOT_DEFAULTS)
-    def generate_task_3(*, target_x: float, target_y: float, g: float, u: float, h: float):
-        from math import sqrt, atan
-        x = np.linspace(0, target_x, config.GRAPH_SAMPLES)
-
-        min_u = sqrt(g) * sqrt(target_y - h + sqrt(target_x**2 + (target_y - h)**2))
-        # since only tan(theta) is used in the equation for the parabola, we can optimize by not taking atan and use value directly
-        min_tan_theta = (target_y - h + sqrt(target_x**2 + (target_y - h)**2)) / target_x
-
-        # min vel trajectory
-        min_y_traj = h + x * min_tan_theta - x**2 * g * (1 + min_tan_theta**2) / 2 / min_u**2
-
-        fig = go.Figure(
-            data=[
-                go.Scatter(name="Min. vel.", x=x, y=min_y_traj, mode="lines", line_shape='spline'),
-                go.Scatter(name="Target",
-                           x=[target_x],
-                           y=[target_y],
-                           text=[f"({target_x}, {target_y})"],
-                           textposition="bottom center",
-                           textfont=dict(size=15),
-                           marker_symbol="x",
-                           marker=dict(size=11),
-                           mode='markers+text')
-            ],
-            layout=config.GO_BASE_LAYOUT,
-        )
-
-        fig.update_layout(
-            title_text="Hitting a Target",
-            xaxis_title="x (m)",
-            yaxis_title="y (m)",
-        )
-
-        if u > min_u:
-            # find high and low ball trajectories
-            a = g / 2 / u**2 * target_x**2
-            b = -target_x
-            c = target_y - h + g / 2 / u**2 * target_x**2
-
-            # low ball
-            low_tan_theta = (-b - sqrt(b**2 - 4 * a * c)) / 2 / a
-            low_y_traj = h + x * low_tan_theta - x**2 * g * (1 + low_tan_theta**2) / 2 / u**2
-
-            # high ball
-            high_tan_theta = (-b + sqrt(b**2 - 4 * a * c)) / 2 / a
-            high_y_traj = h + x * high_tan_theta - x**2 * g * (1 + high_tan_theta**2) / 2 / u**2
+PLOT_DEFAULTS = task_3.PLOT_DEFAULTS
 
-            fig.add_traces(data=[
-                go.Scatter(name="Low ball",
-                           x=x,
-                           y=low_y_traj,
-                           mode="lines",
-                           line_dash="dot",
-                           line_shape='spline'),
-                go.Scatter(name="High ball",
-                           x=x,
-                           y=high_y_traj,
-                           mode="lines",
-                           line_dash="dot",
-                           line_shape='spline')
-            ])
+generate_task_3 = cache_resource_default(**PLOT_DEFAULTS)(task_3.generate_task_3)
 
-            return fig, min_u, atan(min_tan_theta), atan(low_tan_theta), atan(high_tan_theta)
-        else:
-            return fig, min_u, atan(min_tan_theta), None, None
+with code_tab:
+    config.show_source(task_3, analytic)
 
 
 # =====================
@@ -143,7 +78,7 @@ with model_tab:
         **Launch Angle of Minimum Velocity Trajectory**: {degrees(min_theta):.2f} deg
         """
 
-        st.plotly_chart(fig, **config.PLOTLY_CONFIG)
+        config.plotly_chart(fig)
     except Exception as e:
         st.exception(e)
 
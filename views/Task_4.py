@@ -1,10 +1,9 @@
 import streamlit as st
 
-import plotly.graph_objects as go
-import numpy as np
-
 import config
-from cache import cache_data_default
+from cache import cache_resource_default
+from physics import analytic
+from tasks import task_4
 
 st.set_page_config(page_title="Task 4", **config.PAGE_CONFIG)
 config.apply_custom_styles()
@@ -22,80 +21,16 @@ model_tab, math_tab, code_tab, = st.tabs(["Model", "Derivations", "Source Code"]
 # CODE
 # =====================
 
-PLOT_DEFAULTS = {"theta": 60.0, "g": 9.81, "u": 10.0, "h": 2.0}
-
-with code_tab, st.echo():
-
-    @cache_data_default(**PLOT_DEFAULTS)
-    def generate_task_4(*, theta: float, g: float, u: float, h: float):
-        from math import sin, cos, sqrt, radians, asin
-
-        # inputted trajectory
-        rad = radians(theta)
-        ux = u * cos(rad)
-        uy = u * sin(rad)
-
-        total_t = (uy + sqrt(uy**2 + 2 * g * h)) / g
-        range = ux * total_t
-
-        original_x = np.linspace(0, range, config.GRAPH_SAMPLES)
-        inputted_traj = h + (uy / ux) * original_x - (g / 2 / ux**2) * original_x**2
-
-        # maximize range
-        rad_max = asin(1 / sqrt(2 + 2 * g * h / u**2))
-        ux = u * cos(rad_max)
-        uy = u * sin(rad_max)
-
-        max_range_t = (uy + sqrt(uy**2 + 2 * g * h)) / g
-        range_max = u / g * sqrt(u**2 + 2 * g * h)
-
-        max_range_x = np.linspace(0, range_max, config.GRAPH_SAMPLES)
-        max_range_traj = h + (uy / ux) * max_range_x - (g / 2 / ux**2) * max_range_x**2
-
-        fig = go.Figure(
-            data=[
-                go.Scatter(name="Trajectory",
-                           x=original_x,
-                           y=inputted_traj,
-                           mode="lines",
-                           line_shape='spline'),
-                go.Scatter(name="Max Range",
-                           x=max_range_x,
-                           y=max_range_traj,
-                           mode="lines",
-                           line_dash="dashdot",
-                           line_shape='spline'),
-                go.Scatter(name="Range",
-                           x=[range],
-                           y=[0],
-                           text=[f"({range:.2f}, {0})"],
-                           textposition="top center",
-                           textfont=dict(size=14),
-                           marker_symbol="x",
-                           marker=dict(size=11),
-                           mode='markers+text',
-                           showlegend=False),
-                go.Scatter(name="Max. Range",
-                           x=[range_max],
-                           y=[0],
-                           text=[f"({range_max:.2f}, {0})"],
-                           textposition="bottom center",
-                           textfont=dict(size=14),
-                           marker_symbol="x",
-                           marker=dict(size=11),
-                           mode='markers+text',
-                           showlegend=False),
-            ],
-            layout=config.GO_BASE_LAYOUT,
-        )
-
-        fig.update_layout(
-            title_text="Analytical Model",
-            xaxis_title="x (m)",
-            yaxis_title="y (m)",
-        )
-
-        return fig, range, total_t, rad_max, range_max, max_range_t
+PLOT_DEFAULTS = task_4.PLOT_DEFAULTS
+HEATMAP_DEFAULTS = task_4.HEATMAP_DEFAULTS
+QUANTITIES = task_4.QUANTITIES
+
+generate_task_4 = cache_resource_default(scaling=task_4.SCALING,
+                                         **PLOT_DEFAULTS)(task_4.generate_task_4)
+generate_task_4_heatmap = cache_resource_default(**HEATMAP_DEFAULTS)(task_4.generate_task_4_heatmap)
+
+with code_tab:
+    config.show_source(task_4, analytic)
 
 
 # =====================
@@ -103,55 +38,91 @@ with code_tab, st.echo():
 # =====================
 
 with model_tab:
-    with st.form("task_4_form"):
-        "#### **Parameters**"
+    mode = st.radio("View", ["Trajectory", "Heatmap"], horizontal=True, label_visibility="collapsed")
 
-        col1, col2 = st.columns(2, gap="large")
+if mode == "Trajectory":
+    with model_tab:
+        with st.form("task_4_form"):
+            "#### **Parameters**"
 
-        with col1:
-            theta = st.number_input("Launch Angle (deg)",
-                                    min_value=0.0,
-                                    max_value=90.0,
-                                    value=PLOT_DEFAULTS["theta"])
-            gravity = st.number_input("Gravity (m⋅s⁻²)", min_value=0.0, value=PLOT_DEFAULTS["g"])
+            col1, col2 = st.columns(2, gap="large")
 
-        with col2:
-            vel = st.number_input("Initial Speed (m⋅s⁻¹)", min_value=0.0, value=PLOT_DEFAULTS["u"])
-            height = st.number_input("Height (m)", value=PLOT_DEFAULTS["h"])
+            with col1:
+                theta = st.number_input("Launch Angle (deg)",
+                                        min_value=0.0,
+                                        max_value=90.0,
+                                        value=PLOT_DEFAULTS["theta"])
+                gravity = st.number_input("Gravity (m⋅s⁻²)", min_value=0.0, value=PLOT_DEFAULTS["g"])
 
-        submitted = st.form_submit_button("Generate")
+            with col2:
+                vel = st.number_input("Initial Speed (m⋅s⁻¹)", min_value=0.0, value=PLOT_DEFAULTS["u"])
+                height = st.number_input("Height (m)", value=PLOT_DEFAULTS["h"])
 
-    try:
-        results = generate_task_4(theta=theta, g=gravity, u=vel, h=height)
-        fig, range, total_t, rad_max, range_max, max_range_t = results
+            submitted = st.form_submit_button("Generate")
 
-        from math import degrees
+        try:
+            results = generate_task_4(theta=theta, g=gravity, u=vel, h=height)
+            fig, range, total_t, theta_max, range_max, max_range_t = results
 
-        st.write("")
-        f"""
-        #### Calculated Values
+            st.write("")
+            f"""
+            #### Calculated Values
         
-        ##### _Original Trajectory_ 
+            ##### _Original Trajectory_ 
 
-        **Range**: {range:.3f} m
+            **Range**: {range:.3f} m
         
-        **Flight Time**: {total_t:.3f} s
+            **Flight Time**: {total_t:.3f} s
 
-        """
-        st.write("")
-        f"""
-        ##### _Trajectory Maximizing Range_    
+            """
+            st.write("")
+            f"""
+            ##### _Trajectory Maximizing Range_    
     
-        **Maximum Range**: {range_max:.3f} m
+            **Maximum Range**: {range_max:.3f} m
         
-        **Launch Angle**: {degrees(rad_max):.3f} deg
+            **Launch Angle**: {theta_max:.3f} deg
         
-        **Flight Time**: {max_range_t:.3f} s
-        """
-
-        st.plotly_chart(fig, **config.PLOTLY_CONFIG)
-    except Exception as e:
-        st.exception(e)
+            **Flight Time**: {max_range_t:.3f} s
+            """
+
+            config.plotly_chart(fig)
+        except Exception as e:
+            st.exception(e)
+
+else:
+    with model_tab:
+        with st.form("task_4_heatmap_form"):
+            "#### **Parameters**"
+
+            col1, col2 = st.columns(2, gap="large")
+
+            with col1:
+                max_vel = st.number_input("Maximum Speed (m⋅s⁻¹)",
+                                          min_value=0.001,
+                                          value=HEATMAP_DEFAULTS["u_max"])
+                gravity = st.number_input("Gravity (m⋅s⁻²)",
+                                          min_value=0.0,
+                                          value=HEATMAP_DEFAULTS["g"])
+
+            with col2:
+                height = st.number_input("Height (m)", value=HEATMAP_DEFAULTS["h"])
+                quantity = st.selectbox("Quantity",
+                                        options=QUANTITIES,
+                                        format_func=lambda key: QUANTITIES[key][0],
+                                        index=list(QUANTITIES).index(HEATMAP_DEFAULTS["quantity"]))
+
+            submitted = st.form_submit_button("Generate")
+
+        try:
+            fig = generate_task_4_heatmap(g=gravity, h=height, u_max=max_vel, quantity=quantity)
+
+            f"""
+            {QUANTITIES[quantity][0]} of every launch from {height:g} m, on a grid of {config.HEATMAP_SAMPLES[0]} launch angles by {config.HEATMAP_SAMPLES[1]} speeds. The dashed line is the angle of maximum range for each speed.
+            """
+            config.plotly_chart(fig)
+        except Exception as e:
+            st.exception(e)
 
 # =====================
 # DERIVATION
@@ -1,10 +1,9 @@
 import streamlit as st
 
-import plotly.graph_objects as go
-import numpy as np
-
 import config
-from cache import cache_data_default
+from cache import cache_resource_default
+from physics import analytic
+from tasks import task_6
 
 st.set_page_config(page_title="Task 6", **config.PAGE_CONFIG)
 config.apply_custom_styles()
@@ -22,95 +21,13 @@ model_tab, math_tab, code_tab, = st.tabs(["Model", "Derivations", "Source Code"]
 # CODE
 # =====================
 
-PLOT_DEFAULTS = {"theta": 60.0, "g": 9.81, "u": 10.0, "h": 2.0}
-
-with code_tab, st.echo():
-
-    @cache_data_default(**PLOT_DEFAULTS)
-    def generate_task_6(*, theta: float, g: float, u: float, h: float):
-        from math import sin, cos, sqrt, radians, asin, log, tan
-
-        def calc_dist(rad, x, is_max=False):
-            calc_z_part = lambda z: 0.5 * log(abs(sqrt(1 + z**2) + z)) + 0.5 * z * sqrt(1 + z**2)
-
-            if h == 0:
-                if is_max:
-                    return u**2 / g * (log(1 + sqrt(2)) + sqrt(2)) / 2
-                else:
-                    return u**2 / g * (log((1 + sin(rad)) / cos(rad)) * cos(rad)**2 + sin(rad))
-            else:
-                z1 = tan(rad)
-                z2 = tan(rad) - g * x / u**2 * (1 + tan(rad)**2)
-                calc_z1 = calc_z_part(z1)
-                calc_z2 = calc_z_part(z2)
-                return u**2 / g / (1 + tan(rad)**2) * (calc_z1 - calc_z2)
-
-        # inputted trajectory
-        rad = radians(theta)
-        ux = u * cos(rad)
-        uy = u * sin(rad)
-
-        total_t = (uy + sqrt(uy**2 + 2 * g * h)) / g
-        range = ux * total_t
-        dist = calc_dist(rad, range)
+PLOT_DEFAULTS = task_6.PLOT_DEFAULTS
 
-        original_x = np.linspace(0, range, config.GRAPH_SAMPLES)
-        inputted_traj = h + (uy / ux) * original_x - (g / 2 / ux**2) * original_x**2
+generate_task_6 = cache_resource_default(scaling=task_6.SCALING,
+                                         **PLOT_DEFAULTS)(task_6.generate_task_6)
 
-        # maximize range
-        rad_max = asin(1 / sqrt(2 + 2 * g * h / u**2))
-        ux = u * cos(rad_max)
-        uy = u * sin(rad_max)
-
-        max_range_t = (uy + sqrt(uy**2 + 2 * g * h)) / g
-        range_max = u / g * sqrt(u**2 + 2 * g * h)
-        max_dist = calc_dist(rad, range_max, is_max=True)
-
-        max_range_x = np.linspace(0, range_max, config.GRAPH_SAMPLES)
-        max_range_traj = h + (uy / ux) * max_range_x - (g / 2 / ux**2) * max_range_x**2
-
-        fig = go.Figure(
-            data=[
-                go.Scatter(name="Trajectory",
-                           x=original_x,
-                           y=inputted_traj,
-                           mode="lines",
-                           line_shape='spline'),
-                go.Scatter(name="Max Range",
-                           x=max_range_x,
-                           y=max_range_traj,
-                           mode="lines",
-                           line_dash="dashdot",
-                           line_shape='spline'),
-                go.Scatter(name="Range",
-                           x=[range],
-                           y=[0],
-                           text=[f"({range:.2f}, {0})"],
-                           textposition="top center",
-                           textfont=dict(size=14),
-                           marker_symbol="x",
-                           marker=dict(size=11),
-                           mode='markers+text',
-                           showlegend=False),
-                go.Scatter(name="Max. Range",
-                           x=[range_max],
-                           y=[0],
-                           text=[f"({range_max:.2f}, {0})"],
-                           textposition="bottom center",
-                           textfont=dict(size=14),
-                           marker_symbol="x",
-                           marker=dict(size=11),
-                           mode='markers+text',
-                           showlegend=False),
-            ],
-            layout=config.GO_BASE_LAYOUT,
-        )
-
-        fig.update_layout(title_text="Arc Length of Projectile Motion (with Analytical Model)",
-                          xaxis_title="x (m)",
-                          yaxis_title="y (m)")
-
-        return fig, range, total_t, rad_max, range_max, max_range_t, dist, max_dist
+with code_tab:
+    config.show_source(task_6, analytic)
 
 
 # =====================
@@ -138,9 +55,7 @@ with model_tab:
 
     try:
         results = generate_task_6(theta=theta, g=gravity, u=vel, h=height)
-        fig, range, total_t, rad_max, range_max, max_range_t, dist, max_dist = results
-
-        from math import degrees
+        fig, range, total_t, theta_max, range_max, max_range_t, dist, max_dist = results
 
         st.write("")
         f"""
@@ -159,7 +74,7 @@ with model_tab:
         f"""
         ##### _Trajectory Maximizing Range_ 
         
-        **Launch Angle**: {degrees(rad_max):.3f} deg
+        **Launch Angle**: {theta_max:.3f} deg
         
         **Maximum Range**: {range_max:.3f} m
         
@@ -168,7 +83,7 @@ with model_tab:
         **Arc Length**: {max_dist:.3f} m
         """
 
-        st.plotly_chart(fig, **config.PLOTLY_CONFIG)
+        config.plotly_chart(fig)
     except Exception as e:
         st.exception(e)
 
@@ -1,10 +1,9 @@
 import streamlit as st
 
-import plotly.graph_objects as go
-import numpy as np
-
 import config
-from cache import cache_data_default
+from cache import cache_resource_default
+from physics import analytic
+from tasks import task_7
 
 st.set_page_config(page_title="Task 7", **config.PAGE_CONFIG)
 config.apply_custom_styles()
@@ -22,156 +21,12 @@ model_tab, math_tab, code_tab, = st.tabs(["Model", "Derivations", "Source Code"]
 # CODE
 # =====================
 
-PLOT_DEFAULTS = {"g": 9.81, "u": 10.0, "h": 2.0}
-
-with code_tab, st.echo():
-
-    @cache_data_default(**PLOT_DEFAULTS)
-    def generate_task_7(*, u: float, g: float, h: float):
-        from math import sqrt, sin, cos, asin, radians
-
-        ANGLES = (30, 45, 60, 70.5, 78, 85)
-
-        fig1 = go.Figure(
-            layout=(config.GO_BASE_LAYOUT |
-                    dict(title_text="Range vs. Time", xaxis_title="t (s)", yaxis_title="r (m)")))
-
-        fig2 = go.Figure(layout=dict(**config.GO_BASE_LAYOUT,
-                                     title_text="XY Graph",
-                                     xaxis_title="x (m)",
-                                     yaxis_title="y (m)"))
-
-        minima_x_list = []
-        minima_y_list = []
-
-        maxima_x_list = []
-        maxima_y_list = []
-
-        xy_minima_x_list = []
-        xy_minima_y_list = []
-
-        xy_maxima_x_list = []
-        xy_maxima_y_list = []
-
-        for theta in ANGLES:
-            rad = radians(theta)
-
-            ux = u * cos(rad)
-            uy = u * sin(rad)
-
-            total_t = (uy + sqrt(uy**2 + 2 * g * h)) / g
-
-            t = np.linspace(0, total_t, config.GRAPH_SAMPLES)
-            range = np.sqrt(u**2 * t**2 - g * t**3 * u * sin(rad) + g**2 * t**4 / 4)
-
-            fig1.add_trace(
-                go.Scatter(name=rf"{theta} deg", x=t, y=range, mode="lines", line_shape="spline"))
-
-            # Using what we did in task 2 for figure
-
-            total_x = ux * total_t
-
-            x = np.linspace(0, total_x, config.GRAPH_SAMPLES)
-            y = h + (uy / ux) * x - (g / 2 / ux**2) * x**2
-
-            fig2.add_trace(
-                go.Scatter(name=rf"{theta} deg", x=x, y=y, mode="lines", line_shape="spline"))
-
-            if theta > 70.5:
-                minima_x_list.append(minima_x := 3 * u / 2 / g *
-                                     (sin(rad) - sqrt(sin(rad)**2 - 8 / 9)))
-                minima_y_list.append(
-                    sqrt(u**2 * minima_x**2 - g * minima_x**3 * u * sin(rad) +
-                         g**2 * minima_x**4 / 4))
-
-                maxima_x_list.append(maxima_x := 3 * u / 2 / g *
-                                     (sin(rad) + sqrt(sin(rad)**2 - 8 / 9)))
-                maxima_y_list.append(
-                    sqrt(u**2 * maxima_x**2 - g * maxima_x**3 * u * sin(rad) +
-                         g**2 * maxima_x**4 / 4))
-
-                xy_minima_x_list.append(ux * minima_x)
-                xy_minima_y_list.append(uy * minima_x - g / 2 * minima_x**2 + h)
-
-                xy_maxima_x_list.append(ux * maxima_x)
-                xy_maxima_y_list.append(uy * maxima_x - g / 2 * maxima_x**2 + h)
-
-        fig1.add_traces(data=[
-            go.Scatter(
-                name="Minima",
-                x=minima_x_list,
-                y=minima_y_list,
-                textfont=dict(size=14),
-                marker_symbol="x",
-                marker=dict(size=8, color="deepskyblue"),
-                mode='markers+text',
-            ),
-            go.Scatter(
-                name="Maxima",
-                x=maxima_x_list,
-                y=maxima_y_list,
-                textfont=dict(size=14),
-                marker_symbol="x",
-                marker=dict(size=8, color="limegreen"),
-                mode='markers+text',
-            )
-        ])
-
-        # plot corresponding points on XY graph
-        fig2.add_traces(data=[
-            go.Scatter(
-                name="r vs. t Minima",
-                x=xy_minima_x_list,
-                y=xy_minima_y_list,
-                textfont=dict(size=14),
-                marker_symbol="x",
-                marker=dict(size=8, color="deepskyblue"),
-                mode='markers+text',
-            ),
-            go.Scatter(
-                name="r vs. t Maxima",
-                x=xy_maxima_x_list,
-                y=xy_maxima_y_list,
-                textfont=dict(size=14),
-                marker_symbol="x",
-                marker=dict(size=8, color="limegreen"),
-                mode='markers+text',
-            )
-        ])
-
-        # Point of equality (ie having one saddle point instead of a maxima and minima)
-        rad = asin(2 * sqrt(2) / 3)
-
-        saddle_x = u / g * sqrt(2)
-        saddle_y = sqrt(u**2 * saddle_x**2 - g * saddle_x**3 * u * sin(rad) +
-                        g**2 * saddle_x**4 / 4)
-        fig1.add_trace(
-            go.Scatter(
-                name='Saddle Point',
-                x=[saddle_x],
-                y=[saddle_y],
-                textfont=dict(size=14),
-                marker_symbol="x",
-                marker=dict(size=8, color="salmon"),
-                mode='markers+text',
-            ))
-
-        # plot corresponding point on XY graph
-        xy_maxima_x = u * cos(rad) * saddle_x
-        xy_maxima_y = u * sin(rad) * saddle_x - g / 2 * saddle_x**2 + h
+PLOT_DEFAULTS = task_7.PLOT_DEFAULTS
 
-        fig2.add_trace(
-            go.Scatter(
-                name='Saddle Point',
-                x=[xy_maxima_x],
-                y=[xy_maxima_y],
-                textfont=dict(size=14),
-                marker_symbol="x",
-                marker=dict(size=8, color="salmon"),
-                mode='markers+text',
-            ))
+generate_task_7 = cache_resource_default(**PLOT_DEFAULTS)(task_7.generate_task_7)
 
-        return fig1, fig2
+with code_tab:
+    config.show_source(task_7, analytic)
 
 
 # =====================
@@ -196,8 +51,8 @@ with model_tab:
     try:
         fig1, fig2 = generate_task_7(u=vel, g=gravity, h=height)
 
-        st.plotly_chart(fig1, **config.PLOTLY_CONFIG)
-        st.plotly_chart(fig2, **config.PLOTLY_CONFIG)
+        config.plotly_chart(fig1)
+        config.plotly_chart(fig2)
 
     except Exception as e:
         st.exception(e)
@@ -1,10 +1,11 @@
 import streamlit as st
 
-import plotly.graph_objects as go
-import numpy as np
-
 import config
-from cache import cache_data_default
+import exports
+import jobs
+from cache import cache_resource_default
+from physics import bounce
+from tasks import task_8
 
 st.set_page_config(page_title="Task 8", **config.PAGE_CONFIG)
 config.apply_custom_styles()
@@ -22,116 +23,13 @@ model_tab, math_tab, code_tab, = st.tabs(["Model", "Derivations", "Source Code"]
 # CODE
 # =====================
 
-PLOT_DEFAULTS = {"theta": 45.0, "g": 9.81, "u": 6.0, "h": 2.0, "dt": 0.02, "C": 0.7, "N": 6}
-
-with code_tab, st.echo():
-
-    @cache_data_default(**PLOT_DEFAULTS)
-    def generate_task_8(*, theta: float, g: float, u: float, h: float, dt: float, C: float, N: int):
-        from math import sin, cos, radians
-
-        ANIMATION_STEP = 1
-
-        rad = radians(theta)
-
-        ux = u * cos(rad)
-        uy = u * sin(rad)
-
-        x_list = []
-        y_list = []
-        total_t = 0
-
-        x = 0
-        y = h
-
-        dx = ux * dt
-
-        bounces = 0
-        while bounces < N:
-            x = x + dx  # since x acceleration is 0, dx is constant
-            y = y + uy * dt
-
-            uy = uy - g * dt
-
-            if y < 0:
-                y = 0
-                uy = -uy * C
-                bounces += 1
-
-            total_t += dt
-            x_list.append(x)
-            y_list.append(y)
-
-        frames_n = len(x_list)
-        animation_speed = dt * 1000 * ANIMATION_STEP  # sec -> ms
-
-        fig = go.Figure(
-            data=[
-                go.Scatter(x=x_list, y=y_list, mode="lines", line_shape='spline'),
-                go.Scatter(x=x_list, y=y_list, mode="lines", line_shape='spline'),
-            ],
-            frames=[
-                go.Frame(data=[
-                    go.Scatter(x=[x_list[i]],
-                               y=[y_list[i]],
-                               mode="markers",
-                               marker=dict(color="red", size=10))
-                ]) for i in range(0, frames_n, ANIMATION_STEP)
-            ],
-            layout=config.GO_BASE_LAYOUT,
-        )
-
-        fig.update_layout(
-            title_text="Bouncing Projectile",
-            xaxis_title="x (m)",
-            yaxis_title="y (m)",
-            hovermode="closest",
-            width=800,
-            height=550,
-            autosize=False,
-            margin=dict(t=150),
-            xaxis=dict(range=[0, max(x_list) + 1], autorange=False),
-            yaxis=dict(range=[0, max(y_list) + 1], autorange=False),
-            updatemenus=[
-                dict(type="buttons",
-                     buttons=[
-                         dict(label="Play",
-                              method="animate",
-                              args=[
-                                  None,
-                                  dict(frame=dict(duration=animation_speed, redraw=False),
-                                       fromcurrent=True,
-                                       transition=dict(duration=animation_speed,
-                                                       easing="quadratic-in-out"))
-                              ]),
-                         dict(label="Pause",
-                              method="animate",
-                              args=[[None],
-                                    dict(frame=dict(duration=0, redraw=False),
-                                         mode="immediate",
-                                         transition=dict(duration=0))])
-                     ],
-                     direction="left",
-                     pad=dict(r=10, t=10),
-                     xanchor="left",
-                     yanchor="top",
-                     x=0.06,
-                     y=1.18,
-                     showactive=False)
-            ],
-            annotations=[
-                dict(text="Animate:",
-                     showarrow=False,
-                     x=0,
-                     y=1.15,
-                     font=dict(size=18),
-                     yref="paper",
-                     align="right")
-            ],
-            showlegend=False,
-        )
-
-        return fig, total_t
+PLOT_DEFAULTS = task_8.PLOT_DEFAULTS
+METHODS = task_8.METHODS
+
+generate_task_8 = cache_resource_default(**PLOT_DEFAULTS)(task_8.generate_task_8)
+
+with code_tab:
+    config.show_source(task_8, bounce)
 
 
 # =====================
@@ -156,27 +54,46 @@ with model_tab:
                                  step=0.01)
             n_bounces = st.number_input("Number of Bounces",
                                         min_value=1,
-                                        max_value=10,
+                                        max_value=10_000,
                                         value=PLOT_DEFAULTS["N"])
 
         with col2:
             vel = st.number_input("Initial Speed (m⋅s⁻¹)", min_value=0.0, value=PLOT_DEFAULTS["u"])
-            height = st.number_input("Height (m)", value=PLOT_DEFAULTS["h"])
+            height = st.number_input("Height (m)", min_value=0.0, value=PLOT_DEFAULTS["h"])
             coeff = st.number_input("Coefficient of Restitution",
                                     min_value=0.0,
                                     max_value=1.0,
                                     value=PLOT_DEFAULTS["C"])
+            method = st.selectbox("Method",
+                                  options=METHODS,
+                                  format_func=METHODS.get,
+                                  index=list(METHODS).index(PLOT_DEFAULTS["method"]),
+                                  help="The time interval is only used by the Verlet method.")
+            min_height = st.number_input("Rolling Threshold (m)",
+                                         min_value=0.0,
+                                         value=PLOT_DEFAULTS["min_height"],
+                                         step=0.001,
+                                         format="%.3f",
+                                         help="Bounces lower than this are treated as rolling.")
 
         submitted = st.form_submit_button("Generate")
 
     try:
-        fig, total_t = generate_task_8(theta=theta,
-                                       g=gravity,
-                                       u=vel,
-                                       h=height,
-                                       dt=dt,
-                                       C=coeff,
-                                       N=n_bounces)
+        job = jobs.latest("task_8",
+                          generate_task_8,
+                          theta=theta,
+                          g=gravity,
+                          u=vel,
+                          h=height,
+                          dt=dt,
+                          C=coeff,
+                          N=n_bounces,
+                          method=method,
+                          min_height=min_height)
+        fig, total_t, rest_t, rest_x, animation, notes = jobs.result(job, text="Simulating...")
+        frames_n, build_time, payload = animation
+        for note in notes:
+            st.warning(note, icon="⚠️")
 
         st.write("")
         f"""
@@ -184,7 +101,22 @@ with model_tab:
         
         **Flight Time**: {total_t:.3f} s
         """
-        st.plotly_chart(fig, **config.PLOTLY_CONFIG)
+        if rest_t is not None and rest_t != float("inf"):
+            f"""
+            **Time to Rest**: {rest_t:.3f} s
+            
+            **Distance to Rest**: {rest_x:.3f} m
+            """
+        config.plotly_chart(fig)
+        st.caption(f"Animation: {frames_n} frames, {payload / 1024:.1f} kB, "
+                   f"built in {build_time * 1000:.0f} ms")
+
+        "#### Export Data"
+        exports.download("task_8_export",
+                         task_8.export_task_8,
+                         name="task_8",
+                         text="Simulating...",
+                         **job.kwargs)
     except Exception as e:
         st.exception(e)
 
@@ -217,6 +149,30 @@ with math_tab:
         t_{n+1} = t_n + \Delta t
     \end{equation}
     $$
+    
+    ##### Exact Bounces
+    
+    Without air resistance, the path between two bounces is an exact parabola, so there is no need to step through time to find the next bounce. An arc leaving height $y_0$ with vertical velocity $v_{y_0}$ hits the ground after
+    
+    $$
+    \begin{equation}
+        t_b = \frac{v_{y_0} + \sqrt{v_{y_0}^2 + 2gy_0}}{g}
+    \end{equation}
+    $$
+    
+    with vertical velocity $v_{y_0} - gt_b$, and the next arc starts from $y_0 = 0$ with $C$ times that speed, upwards. Each bounce then costs a single calculation, and the arcs only need to be sampled as finely as the plot requires. Unlike the Verlet method, the ball is never clamped back to $y = 0$ after passing below the ground, so no energy is gained or lost at a bounce other than through $C$.
+    
+    ##### Time to Rest
+    
+    If the first impact happens at $t_1$ with speed $v_1$, the ball leaves the $k$-th bounce with speed $C^k v_1$, and that arc lasts $\frac{2C^k v_1}{g}$. The bounce times therefore form a geometric series, so the time of the $N$-th bounce is
+    
+    $$
+    \begin{equation}
+        t_N = t_1 + \frac{2v_1}{g}\sum_{k=1}^{N-1}C^k = t_1 + \frac{2Cv_1}{g}\cdot\frac{1-C^{N-1}}{1-C}
+    \end{equation}
+    $$
+    
+    For $C < 1$ the series converges even though there are infinitely many bounces, and the ball comes to rest after $t_1 + \frac{2Cv_1}{g(1-C)}$, having travelled $u_x$ times that distance. Bounces lower than the rolling threshold are too small to see and are drawn as the ball rolling along the ground.
     """
 
 st.divider()
@@ -1,10 +1,11 @@
 import streamlit as st
 
-import plotly.graph_objects as go
-import numpy as np
-
 import config
-from cache import cache_data_default
+import exports
+import jobs
+from cache import cache_resource_default
+from physics import analytic, drag, drag_table
+from tasks import task_9
 
 st.set_page_config(page_title="Task 9", **config.PAGE_CONFIG)
 config.apply_custom_styles()
@@ -22,243 +23,13 @@ model_tab, math_tab, code_tab, = st.tabs(["Model", "Derivations", "Source Code"]
 # CODE
 # =====================
 
-PLOT_DEFAULTS = {
-    "theta": 30.0,
-    "g": 9.81,
-    "u": 20.0,
-    "h": 2.0,
-    'Cd': 1.0,
-    'a': 0.007854,
-    'P': 1.0,
-    'm': 0.1,
-    "dt": 0.01
-}
-
-with code_tab, st.echo():
-
-    @cache_data_default(**PLOT_DEFAULTS)
-    def generate_task_9(*, theta: float, u: float, h: float, g: float, Cd: float, a: float,
-                        P: float, m: float, dt: float):
-        from math import sqrt, sin, cos, radians
-
-        rad = radians(theta)
-
-        ux = u * cos(rad)
-        uy = u * sin(rad)
-
-        #Drag Free Model As in Task 2
-
-        drag_free_apogee_x = ux * uy / g
-        drag_free_apogee_y = h + (uy**2) / 2 / g
-
-        total_t = (uy + sqrt(uy**2 + 2 * g * h)) / g
-        drag_free_t = np.linspace(0, total_t, config.GRAPH_SAMPLES)
-
-        drag_free_x = ux * drag_free_t
-        drag_free_y = h + uy * drag_free_t - g * drag_free_t**2 / 2
-        drag_free_vx = np.ones(config.GRAPH_SAMPLES) * ux
-        drag_free_vy = uy - g * drag_free_t
-        drag_free_v = np.sqrt(drag_free_vx**2 + drag_free_vy**2)
-
-        #Resistance Included Model Using Verlet Method
-
-        k = Cd * P * a / m / 2
-
-        total_t_drag = 0
-
-        current_x = 0
-        current_y = h
-
-        current_v = u
-        current_vx = ux
-        current_vy = uy
-
-        drag_t = []
-        drag_x = []
-        drag_y = []
-        drag_vx = []
-        drag_vy = []
-        drag_v = []
-
-        while current_y > 0:
-            drag_t.append(total_t_drag)
-            drag_x.append(current_x)
-            drag_y.append(current_y)
-            drag_vx.append(current_vx)
-            drag_vy.append(current_vy)
-            drag_v.append(current_v)
-
-            ax = -current_vx * current_v * k
-            ay = -g - current_vy * current_v * k
-            current_x += current_vx * dt + ax * dt**2 / 2
-            current_y += current_vy * dt + ay * dt**2 / 2
-            current_vx += ax * dt
-            current_vy += ay * dt
-            current_v = sqrt(current_vx**2 + current_vy**2)
-
-            total_t_drag += dt
-
-        # get approximate apogee for drag included trajectory:
-
-        apogee_idx = max(range(len(drag_y)), key=drag_y.__getitem__)
-
-        drag_apogee_x = drag_x[apogee_idx]
-        drag_apogee_y = drag_y[apogee_idx]
-
-        y_x = go.Figure(
-            layout=config.GO_BASE_LAYOUT,
-            data=[
-                go.Scatter(name="Drag Included",
-                           x=drag_x,
-                           y=drag_y,
-                           mode="lines",
-                           line_shape='spline'),
-                go.Scatter(name="Drag Free",
-                           x=drag_free_x,
-                           y=drag_free_y,
-                           mode="lines",
-                           line_dash="dashdot",
-                           line_shape='spline'),
-                go.Scatter(name="Drag Included Apogee (Approx.)",
-                           x=[drag_apogee_x],
-                           y=[drag_apogee_y],
-                           text=[f"({drag_apogee_x:.2f}, {drag_apogee_y:.2f})"],
-                           textposition="bottom center",
-                           textfont=dict(size=14),
-                           marker_symbol="0",
-                           marker=dict(size=8),
-                           mode='markers+text'),
-                go.Scatter(name="Drag Free Apogee",
-                           x=[drag_free_apogee_x],
-                           y=[drag_free_apogee_y],
-                           text=[f"({drag_free_apogee_x:.2f}, {drag_free_apogee_y:.2f})"],
-                           textposition="bottom center",
-                           textfont=dict(size=14),
-                           marker_symbol="0",
-                           marker=dict(size=8),
-                           mode='markers+text'),
-                go.Scatter(name="Drag Included Range",
-                           x=[drag_x[-1]],
-                           y=[0],
-                           text=[f"({drag_x[-1]:.2f}, {0})"],
-                           textposition="top center",
-                           textfont=dict(size=14),
-                           marker_symbol="x",
-                           marker=dict(size=11),
-                           mode='markers+text',
-                           showlegend=False),
-                go.Scatter(name="Drag Free Range",
-                           x=[drag_free_x[-1]],
-                           y=[0],
-                           text=[f"({drag_free_x[-1]:.2f}, {0})"],
-                           textposition="top center",
-                           textfont=dict(size=14),
-                           marker_symbol="x",
-                           marker=dict(size=11),
-                           mode='markers+text',
-                           showlegend=False)
-            ],
-        )
-
-        y_x.update_layout(
-            title_text="Projectile Motion Model",
-            xaxis_title="x (m)",
-            yaxis_title="y (m)",
-        )
+PLOT_DEFAULTS = task_9.PLOT_DEFAULTS
+METHODS = task_9.METHODS
 
-        y_t = go.Figure(
-            layout=config.GO_BASE_LAYOUT,
-            data=[
-                go.Scatter(name="Drag Included",
-                           x=drag_t,
-                           y=drag_y,
-                           mode="lines",
-                           line_shape='spline'),
-                go.Scatter(name="Drag Free",
-                           x=drag_free_t,
-                           y=drag_free_y,
-                           mode="lines",
-                           line_dash="dashdot",
-                           line_shape='spline'),
-            ],
-        )
+generate_task_9 = cache_resource_default(**PLOT_DEFAULTS)(task_9.generate_task_9)
 
-        y_t.update_layout(
-            title_text="Y Position vs. Time",
-            xaxis_title="t (s)",
-            yaxis_title="y (m)",
-        )
-
-        vx_t = go.Figure(
-            layout=config.GO_BASE_LAYOUT,
-            data=[
-                go.Scatter(name="Drag Included",
-                           x=drag_t,
-                           y=drag_vx,
-                           mode="lines",
-                           line_shape='spline'),
-                go.Scatter(name="Drag Free",
-                           x=drag_free_t,
-                           y=drag_free_vx,
-                           mode="lines",
-                           line_dash="dashdot",
-                           line_shape='spline')
-            ],
-        )
-
-        vx_t.update_layout(
-            title_text="X Velocity vs. Time",
-            xaxis_title="t (s)",
-            yaxis_title="vx (ms⁻¹)",
-        )
-
-        vy_t = go.Figure(
-            layout=config.GO_BASE_LAYOUT,
-            data=[
-                go.Scatter(name="Drag Included",
-                           x=drag_t,
-                           y=drag_vy,
-                           mode="lines",
-                           line_shape='spline'),
-                go.Scatter(name="Drag Free",
-                           x=drag_free_t,
-                           y=drag_free_vy,
-                           mode="lines",
-                           line_dash="dashdot",
-                           line_shape='spline')
-            ],
-        )
-
-        vy_t.update_layout(
-            title_text="Y Velocity vs. Time",
-            xaxis_title="t (s)",
-            yaxis_title="vy (ms⁻¹)",
-        )
-
-        v_t = go.Figure(
-            layout=config.GO_BASE_LAYOUT,
-            data=[
-                go.Scatter(name="Drag Included",
-                           x=drag_t,
-                           y=drag_v,
-                           mode="lines",
-                           line_shape='spline'),
-                go.Scatter(name="Drag Free",
-                           x=drag_free_t,
-                           y=drag_free_v,
-                           mode="lines",
-                           line_dash="dashdot",
-                           line_shape='spline')
-            ],
-        )
-
-        v_t.update_layout(
-            title_text="Velocity vs. Time",
-            xaxis_title="t (s)",
-            yaxis_title="v (ms⁻¹)",
-        )
-
-        return y_x, y_t, vx_t, vy_t, v_t, total_t, total_t_drag, k
+with code_tab:
+    config.show_source(task_9, analytic, drag, drag_table)
 
 
 # =====================
@@ -284,6 +55,16 @@ with model_tab:
                                         step=0.001,
                                         value=PLOT_DEFAULTS["dt"],
                                         format="%.3f")
+            method = st.selectbox("Numerical Method",
+                                  options=METHODS,
+                                  format_func=METHODS.get,
+                                  index=list(METHODS).index(PLOT_DEFAULTS["method"]))
+            tolerance = st.number_input("Tolerance",
+                                        min_value=1e-12,
+                                        max_value=1e-1,
+                                        value=PLOT_DEFAULTS["tol"],
+                                        format="%.1e",
+                                        help="Error allowed per step of the adaptive method.")
 
         with col2:
             Cd = st.number_input("Drag Coefficient",
@@ -310,15 +91,24 @@ with model_tab:
         submitted = st.form_submit_button("Generate")
 
     try:
-        y_x, y_t, vx_t, vy_t, v_t, total_t, total_t_drag, k = generate_task_9(theta=theta,
-                                                                              u=vel,
-                                                                              h=height,
-                                                                              g=gravity,
-                                                                              Cd=Cd,
-                                                                              a=area,
-                                                                              P=density,
-                                                                              m=mass,
-                                                                              dt=time_step)
+        job = jobs.latest("task_9",
+                          generate_task_9,
+                          theta=theta,
+                          u=vel,
+                          h=height,
+                          g=gravity,
+                          Cd=Cd,
+                          a=area,
+                          P=density,
+                          m=mass,
+                          dt=time_step,
+                          method=method,
+                          tol=tolerance)
+        results = jobs.result(job, text="Integrating...")
+        y_x, y_t, vx_t, vy_t, v_t, total_t, total_t_drag, k, steps, notes = results
+        for note in notes:
+            st.warning(note, icon="⚠️")
+
         f"""
         #### Calculated Values
         
@@ -327,19 +117,28 @@ with model_tab:
         **Flight Time (With Drag)**: {total_t_drag:.3f} s
         
         **Air Resistance Factor**: {k:.3f}
+        
+        **Integration Steps**: {steps}
         """
 
-        st.plotly_chart(y_x, **config.PLOTLY_CONFIG)
+        config.plotly_chart(y_x)
 
         col_a, col_b = st.columns(2)
 
         with col_a:
-            st.plotly_chart(y_t, **config.PLOTLY_CONFIG)
-            st.plotly_chart(vx_t, **config.PLOTLY_CONFIG)
+            config.plotly_chart(y_t)
+            config.plotly_chart(vx_t)
 
         with col_b:
-            st.plotly_chart(v_t, **config.PLOTLY_CONFIG)
-            st.plotly_chart(vy_t, **config.PLOTLY_CONFIG)
+            config.plotly_chart(v_t)
+            config.plotly_chart(vy_t)
+
+        "#### Export Data"
+        exports.download("task_9_export",
+                         task_9.export_task_9,
+                         name="task_9",
+                         text="Integrating...",
+                         **job.kwargs)
 
     except Exception as e:
         st.exception(e)
@@ -365,6 +164,25 @@ with math_tab:
     The air resistance factor, $k$, is calculated using the formula $k = \frac{C_D\rho A}{2m}$, where $C_D$ is the drag coefficient, $\rho$ is air density (in $\text{kg} \cdot \text{m}^{-3}$), $A$ is the cross sectional area (in $\text{m}^2$), and $m$ is mass (in $\text{kg}$)
     
     Then, using the Verlet method (see task 8), we can model the approximate path of the projectile by assuming the accerlation is constant between small discrete time steps, $\Delta t$. 
+    
+    ##### Adaptive Runge–Kutta (RK45)
+    
+    A fixed $\Delta t$ must be small for the whole flight to get an accurate range, and the final step always overshoots below $y = 0$. The Dormand–Prince method instead takes a 5th order step and a 4th order step from the same six evaluations of the acceleration. Their difference estimates the error of the step, which is used to grow or shrink $\Delta t$ so the error stays below a chosen tolerance. The method also gives a polynomial for the motion within each step, so the exact time at which $y = 0$ (and $v_y = 0$ at the apogee) can be found by root-finding instead of stopping at the first step below the ground.
+    
+    ##### Lookup Table
+    
+    Measuring lengths in units of $u^2/g$, times in units of $u/g$ and speeds in units of $u$, the equations of motion become
+    
+    $$
+    \begin{equation}
+        \begin{aligned}
+            \ddot{x} &= -\kappa v v_x\\
+            \ddot{y} &= -1 - \kappa v v_y
+        \end{aligned}
+    \end{equation}
+    $$
+    
+    with $\kappa = ku^2/g$, a launch speed of $1$ and a launch height of $\eta = gh/u^2$. Every trajectory is therefore a scaled copy of one that only depends on $\theta$, $\eta$ and $\kappa$. These trajectories are integrated once on a grid of the three parameters, and a launch is then found by cubic interpolation between the nearest grid points. The error of the interpolation is measured at the centre of every grid cell when the table is built; if it is larger than a relative error of $10^{-2}$, the launch is integrated with RK45 instead.
     """
 
 st.divider()
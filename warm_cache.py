@@ -0,0 +1,49 @@
+"""Precompute the default outputs of every page into the disk cache.
+
+Run during the Docker build (or at container start, before the server) so that
+the first visit to each page after a deploy only has to load its results:
+
+    python warm_cache.py
+"""
+
+import argparse
+import os
+import sys
+import time
+from glob import glob
+
+from streamlit.testing.v1 import AppTest
+
+import config
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--timeout", type=float, default=120, help="seconds allowed per page")
+    args = parser.parse_args()
+
+    if not config.CACHE_DISK_PATH:
+        print("disk cache is disabled (BPHO_CACHE_DISK_PATH is empty), nothing to warm",
+              file=sys.stderr)
+        return 1
+
+    failed = False
+    for path in sorted(glob("views/Task_*.py")):
+        start = time.perf_counter()
+
+        # running the page with its default inputs stores every generate_task_N result on disk
+        app = AppTest.from_file(path, default_timeout=args.timeout).run()
+
+        if app.exception:
+            failed = True
+            print(f"{path}: failed\n{app.exception[0].value}", file=sys.stderr)
+        else:
+            print(f"{path}: {time.perf_counter() - start:.2f} s")
+
+    print(f"snapshot written to {config.CACHE_DISK_PATH}")
+    return int(failed)
+
+
+if __name__ == "__main__":
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    sys.exit(main())